@@ -12,13 +12,13 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 # Import your models and Base
 from app.core.database import Base
 from app.models import *  # Import all models
-from app.core.config import settings
+from app.core.config import get_settings
 
 # this is the Alembic Config object
 config = context.config
 
 # Set database URL from settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", get_settings().DATABASE_URL)
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
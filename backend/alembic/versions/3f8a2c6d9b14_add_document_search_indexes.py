@@ -0,0 +1,52 @@
+"""Add trigram and full-text search indexes on documents
+
+Adding the stored generated search_tsv column rewrites the documents table
+under an ACCESS EXCLUSIVE lock; reads and writes to documents wait for it.
+The indexes are then built concurrently.
+
+Revision ID: 3f8a2c6d9b14
+Revises: de37a914ec5e
+Create Date: 2026-10-15 10:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a2c6d9b14'
+down_revision = 'de37a914ec5e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated tsvector over the OCR text, searched with @@ instead of ILIKE.
+    # Computing it for existing rows rewrites the table (see above)
+    op.add_column('documents', sa.Column(
+        'search_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(extracted_text, ''))", persisted=True),
+        nullable=True
+    ))
+
+    # Built outside the migration transaction so writes continue meanwhile
+    with op.get_context().autocommit_block():
+        # Trigram index so ILIKE '%q%' on title/filename can use an index scan
+        op.execute(
+            "CREATE INDEX CONCURRENTLY documents_title_trgm ON documents "
+            "USING gin (title gin_trgm_ops, filename gin_trgm_ops)"
+        )
+        op.create_index(
+            'documents_tsv', 'documents', ['search_tsv'], unique=False, postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('documents_tsv', table_name='documents')
+    op.drop_column('documents', 'search_tsv')
+    op.execute("DROP INDEX IF EXISTS documents_title_trgm")
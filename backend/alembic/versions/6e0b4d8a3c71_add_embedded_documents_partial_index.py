@@ -0,0 +1,36 @@
+"""Add partial (user_id, status) index over embedded documents
+
+Revision ID: 6e0b4d8a3c71
+Revises: d2a94f1c7e58
+Create Date: 2026-10-15 13:05:22.447610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e0b4d8a3c71'
+down_revision = 'd2a94f1c7e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets the planner pre-filter semantic search candidates per user; built
+    # concurrently so writes to documents are not blocked during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'documents_user_status_embedded_idx',
+            'documents',
+            ['user_id', 'status'],
+            postgresql_where=sa.text('embedding IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'documents_user_status_embedded_idx', table_name='documents', postgresql_concurrently=True
+        )
@@ -0,0 +1,52 @@
+"""Add HNSW index on documents.embedding
+
+Revision ID: 8c1e7b5a2f03
+Revises: 3f8a2c6d9b14
+Create Date: 2026-10-15 11:04:19.552871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e7b5a2f03'
+down_revision = '3f8a2c6d9b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # The initial migration created embedding as TEXT; convert it if the
+    # manual migrate_embedding_to_vector.sql script has not been run yet
+    bind = op.get_bind()
+    embedding_type = bind.execute(sa.text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'documents'::regclass AND attname = 'embedding'"
+    )).scalar()
+    if embedding_type == 'text':
+        op.execute("""
+            ALTER TABLE documents
+            ALTER COLUMN embedding TYPE vector(1536)
+            USING CASE
+                WHEN embedding IS NULL OR embedding = '' THEN NULL
+                ELSE embedding::vector
+            END
+        """)
+
+    # Replace the IVFFlat index from the manual SQL scripts with HNSW. The
+    # build is long on large tables, so it runs concurrently (outside the
+    # migration transaction) and writes to documents continue meanwhile
+    op.execute("DROP INDEX IF EXISTS documents_embedding_idx")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY documents_embedding_hnsw ON documents "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS documents_embedding_hnsw")
@@ -0,0 +1,58 @@
+"""Weight search_tsv over title, filename and extracted_text
+
+Downtime: a generated column's expression cannot be altered in place, and
+adding the new stored column recomputes it for every row. That rewrites
+the documents table under an ACCESS EXCLUSIVE lock, so reads and writes to
+documents (uploads, lists, searches, OCR updates) block for the duration.
+Building the column under another name and swapping it in would not avoid
+the rewrite. Run this in a maintenance window on large tables. The GIN
+index is rebuilt concurrently once the lock is released.
+
+Revision ID: 9d4f2b7e1a36
+Revises: 6e0b4d8a3c71
+Create Date: 2026-10-15 13:41:09.582214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f2b7e1a36'
+down_revision = '6e0b4d8a3c71'
+branch_labels = None
+depends_on = None
+
+WEIGHTED_TSV = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(filename, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(extracted_text, '')), 'C')"
+)
+TEXT_TSV = "to_tsvector('simple', coalesce(extracted_text, ''))"
+
+
+def _replace_search_tsv(expression: str) -> None:
+    # A generated column's expression cannot be altered in place; the new
+    # column rewrites the table under an exclusive lock (see above)
+    op.drop_index('documents_tsv', table_name='documents')
+    op.drop_column('documents', 'search_tsv')
+    op.add_column('documents', sa.Column(
+        'search_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed(expression, persisted=True),
+        nullable=True
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'documents_tsv', 'documents', ['search_tsv'], unique=False, postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def upgrade() -> None:
+    _replace_search_tsv(WEIGHTED_TSV)
+
+
+def downgrade() -> None:
+    _replace_search_tsv(TEXT_TSV)
@@ -0,0 +1,42 @@
+"""Add composite indexes for the document list query
+
+Revision ID: a4c7e2f91b58
+Revises: 9d4f2b7e1a36
+Create Date: 2026-10-15 14:02:51.310874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e2f91b58'
+down_revision = '9d4f2b7e1a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Newest-first pages per user, optionally filtered by status or file type.
+    # Built concurrently (outside the migration transaction) so uploads and
+    # OCR updates keep writing to documents during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'documents_user_created_idx', 'documents', ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'documents_user_status_created_idx', 'documents', ['user_id', 'status', sa.text('created_at DESC')],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'documents_user_filetype_created_idx', 'documents', ['user_id', 'file_type', sa.text('created_at DESC')],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('documents_user_filetype_created_idx', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('documents_user_status_created_idx', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('documents_user_created_idx', table_name='documents', postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""Store document embeddings as halfvec
+
+Revision ID: b57d0e94c6a1
+Revises: 8c1e7b5a2f03
+Create Date: 2026-10-15 11:47:02.901336
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b57d0e94c6a1'
+down_revision = '8c1e7b5a2f03'
+branch_labels = None
+depends_on = None
+
+
+def _create_hnsw_index(opclass: str) -> None:
+    # The type change rewrites the table under an exclusive lock regardless;
+    # the index build that follows runs concurrently so writes resume first
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY documents_embedding_hnsw ON documents "
+            f"USING hnsw (embedding {opclass}) WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def upgrade() -> None:
+    # fp16 halves heap and index size per embedding (requires pgvector >= 0.7)
+    op.execute("DROP INDEX IF EXISTS documents_embedding_hnsw")
+    op.execute(
+        "ALTER TABLE documents ALTER COLUMN embedding TYPE halfvec(1536) "
+        "USING embedding::halfvec(1536)"
+    )
+    _create_hnsw_index("halfvec_cosine_ops")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS documents_embedding_hnsw")
+    op.execute(
+        "ALTER TABLE documents ALTER COLUMN embedding TYPE vector(1536) "
+        "USING embedding::vector(1536)"
+    )
+    _create_hnsw_index("vector_cosine_ops")
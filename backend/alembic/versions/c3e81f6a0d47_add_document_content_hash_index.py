@@ -0,0 +1,29 @@
+"""Add (user_id, content_sha256) index for upload dedupe
+
+Revision ID: c3e81f6a0d47
+Revises: a4c7e2f91b58
+Create Date: 2026-10-15 15:12:36.204597
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e81f6a0d47'
+down_revision = 'a4c7e2f91b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to documents are not blocked during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'documents_user_sha256_idx', 'documents', ['user_id', 'content_sha256'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('documents_user_sha256_idx', table_name='documents', postgresql_concurrently=True)
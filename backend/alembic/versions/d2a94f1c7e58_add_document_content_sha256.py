@@ -0,0 +1,24 @@
+"""Add content_sha256 to documents
+
+Revision ID: d2a94f1c7e58
+Revises: b57d0e94c6a1
+Create Date: 2026-10-15 12:31:47.118093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a94f1c7e58'
+down_revision = 'b57d0e94c6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'content_sha256')
@@ -2,16 +2,20 @@
 Document API endpoints
 """
 
-from typing import Optional
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status, Query
+import asyncio
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status, Query
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_get, cache_set
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.core.dependencies import CurrentUser, get_current_user
 from app.models.document import DocumentStatus, FileType
 from app.schemas.document import (
     DocumentUploadResponse,
+    DocumentListItemResponse,
     DocumentResponse,
     DocumentUpdateRequest,
     DocumentListResponse,
@@ -19,25 +23,50 @@ from app.schemas.document import (
     SemanticSearchResponse,
     SemanticSearchResult
 )
-from app.services.document_service import DocumentService
+from app.services.document_service import DocumentService, invalidate_search_cache
+from app.workers.tasks import process_ocr
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Cached GET /documents/{id} bodies, each stored after the updated_at it was
+# rendered from and ignored once the row's updated_at moves on
+DOCUMENT_CACHE_TTL_SECONDS = 300
 
-@router.post("/upload", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
+# Validate whole result pages in a single pydantic-core pass
+_DOC_LIST_ADAPTER = TypeAdapter(list[DocumentListItemResponse])
+_SEARCH_RESULTS_ADAPTER = TypeAdapter(list[SemanticSearchResult])
+
+
+def _version_stamp(updated_at: Optional[datetime]) -> bytes:
+    """Encode a document's updated_at for the cached body prefix"""
+    return str(updated_at.timestamp() if updated_at else 0).encode()
+
+
+async def _enqueue_ocr(document_id: int, use_cache: bool = True) -> None:
+    """Publish the OCR task without blocking the event loop on the broker"""
+    await asyncio.to_thread(
+        process_ocr.apply_async, args=[document_id], kwargs={"use_cache": use_cache}, queue="ocr"
+    )
+
+
+@router.post(
+    "/upload",
+    response_model=DocumentUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_200_OK: {"description": "Same file already uploaded, existing document returned"}},
+)
 async def upload_document(
-    background_tasks: BackgroundTasks,
+    response: Response,
     title: str = Form(...),
     file: UploadFile = File(...),
     category: str | None = Form(default=None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Upload a document
 
     Args:
-        background_tasks: FastAPI background tasks
         title: Document title
         file: Uploaded file
         category: Optional document category
@@ -45,20 +74,24 @@ async def upload_document(
         current_user: Authenticated user
 
     Returns:
-        Document upload response
+        Document upload response; 200 with the existing document, unchanged,
+        when the user already uploaded the same file
     """
     document_service = DocumentService(db)
 
     try:
-        document = await document_service.upload_document(
+        document, created = await document_service.upload_document(
             user=current_user,
             title=title,
             file=file,
             category=category,
         )
         
-        # Start OCR processing in background
-        background_tasks.add_task(document_service.process_ocr, document.id)
+        # Hand OCR off to the Celery worker
+        if created:
+            await _enqueue_ocr(document.id)
+        else:
+            response.status_code = status.HTTP_200_OK
         
     except ValueError as exc:
         raise HTTPException(
@@ -67,7 +100,10 @@ async def upload_document(
         ) from exc
 
     return DocumentUploadResponse(
-        message="Document uploaded successfully",
+        message=(
+            "Document uploaded successfully" if created
+            else "Document already uploaded; returning the existing document, title and category unchanged"
+        ),
         document=DocumentResponse.model_validate(document),
     )
 
@@ -76,7 +112,7 @@ async def upload_document(
 async def get_document(
     document_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Get document by ID
@@ -90,22 +126,30 @@ async def get_document(
         Document response
     """
     document_service = DocumentService(db)
-    document = await document_service.repository.get_by_id(document_id)
+    cache_key = f"docpanel:doc:{current_user.id}:{document_id}"
+    
+    # A cached body is served only while the row's updated_at still matches
+    # the one it was rendered from; the cheap version probe runs only then
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        cached_stamp, cached_body = cached.split(b"\n", 1)
+        version = await document_service.repository.get_version_for_user(document_id, current_user.id)
+        if version and _version_stamp(version.updated_at) == cached_stamp:
+            return Response(content=cached_body, media_type="application/json")
     
+    # Other users' documents are reported as missing
+    document = await document_service.repository.get_by_id_for_user(document_id, current_user.id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
     
-    # Check if document belongs to user
-    if document.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    return DocumentResponse.model_validate(document)
+    body = DocumentResponse.model_validate(document).model_dump_json()
+    await cache_set(
+        cache_key, _version_stamp(document.updated_at) + b"\n" + body.encode(), expire=DOCUMENT_CACHE_TTL_SECONDS
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("", response_model=DocumentListResponse)
@@ -116,10 +160,10 @@ async def list_documents(
     file_type: Optional[FileType] = Query(None),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    sort_by: str = Query("created_at", regex="^(created_at|title|file_type|status)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    sort_by: Literal["created_at", "title", "file_type", "status", "relevance"] = Query("created_at"),
+    sort_order: Literal["asc", "desc"] = Query("desc"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     List documents for current user with filtering, sorting, and pagination
@@ -131,7 +175,7 @@ async def list_documents(
         file_type: Filter by file type
         category: Filter by category
         search: Search in title, filename, or extracted text
-        sort_by: Sort field (created_at, title, file_type, status)
+        sort_by: Sort field (created_at, title, file_type, status, relevance)
         sort_order: Sort order (asc, desc)
         db: Database session
         current_user: Authenticated user
@@ -141,7 +185,7 @@ async def list_documents(
     """
     document_service = DocumentService(db)
     
-    documents = await document_service.repository.list_by_user(
+    documents, total = await document_service.list_documents(
         user_id=current_user.id,
         limit=limit,
         offset=offset,
@@ -153,16 +197,8 @@ async def list_documents(
         sort_order=sort_order
     )
     
-    total = await document_service.repository.count_by_user(
-        user_id=current_user.id,
-        status=status,
-        file_type=file_type,
-        category=category,
-        search=search
-    )
-    
     return DocumentListResponse(
-        documents=[DocumentResponse.model_validate(doc) for doc in documents],
+        documents=_DOC_LIST_ADAPTER.validate_python(documents, from_attributes=True),
         total=total,
         limit=limit,
         offset=offset
@@ -174,7 +210,7 @@ async def update_document(
     document_id: int,
     update_data: DocumentUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Update document metadata (title, category)
@@ -217,7 +253,7 @@ async def update_document(
 async def delete_document(
     document_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Delete a document
@@ -254,16 +290,14 @@ async def delete_document(
 @router.post("/{document_id}/reprocess", response_model=DocumentResponse)
 async def reprocess_document(
     document_id: int,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Reprocess OCR for a document
 
     Args:
         document_id: Document ID to reprocess
-        background_tasks: FastAPI background tasks
         db: Database session
         current_user: Authenticated user
 
@@ -271,7 +305,8 @@ async def reprocess_document(
         Document response
     """
     document_service = DocumentService(db)
-    document = await document_service.repository.get_by_id(document_id)
+    # Other users' documents are reported as missing
+    document = await document_service.repository.get_by_id_for_user(document_id, current_user.id)
     
     if not document:
         raise HTTPException(
@@ -279,15 +314,14 @@ async def reprocess_document(
             detail="Document not found"
         )
     
-    # Check if document belongs to user
-    if document.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    # The OCR task does not touch the status until it finishes
+    document = await document_service.repository.update(
+        document.id, {"status": DocumentStatus.PROCESSING}
+    )
+    await invalidate_search_cache(current_user.id)
     
-    # Start OCR processing in background
-    background_tasks.add_task(document_service.process_ocr, document.id)
+    # Hand OCR off to the Celery worker; reprocessing must not reuse cached text
+    await _enqueue_ocr(document.id, use_cache=False)
     
     return DocumentResponse.model_validate(document)
 
@@ -296,7 +330,7 @@ async def reprocess_document(
 async def semantic_search(
     search_request: SemanticSearchRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Perform semantic search on user's documents
@@ -320,13 +354,10 @@ async def semantic_search(
         )
         
         # Convert results to response format
-        search_results = [
-            SemanticSearchResult(
-                document=DocumentResponse.model_validate(doc),
-                similarity=similarity
-            )
-            for doc, similarity in results
-        ]
+        search_results = _SEARCH_RESULTS_ADAPTER.validate_python(
+            [{"document": doc, "similarity": similarity} for doc, similarity in results],
+            from_attributes=True
+        )
         
         return SemanticSearchResponse(
             results=search_results,
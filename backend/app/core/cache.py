@@ -0,0 +1,131 @@
+"""
+Redis-backed response cache
+"""
+
+import logging
+from typing import Optional
+
+from redis import Redis, asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[aioredis.Redis] = None
+_sync_redis: Optional[Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the shared Redis client, creating it on first use"""
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(get_settings().REDIS_URL)
+    return _redis
+
+
+def get_sync_redis() -> Redis:
+    """Return the shared blocking Redis client for worker threads, creating it on first use"""
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = Redis.from_url(get_settings().REDIS_URL)
+    return _sync_redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client"""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
+
+
+async def ping_redis() -> bool:
+    """Return whether Redis answers a PING"""
+    try:
+        return await get_redis().ping()
+    except RedisError as e:
+        logger.warning(f"Redis readiness check failed: {str(e)}")
+        return False
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """
+    Get a cached value
+    
+    Returns:
+        Cached bytes, or None on a miss or if Redis is unavailable
+    """
+    try:
+        return await get_redis().get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+
+async def cache_set(key: str, value: bytes | str, expire: int) -> None:
+    """Store a value for `expire` seconds, ignoring Redis failures"""
+    try:
+        await get_redis().set(key, value, ex=expire)
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def cache_incr(key: str) -> Optional[int]:
+    """
+    Atomically increment a counter
+    
+    Returns:
+        The new value, or None if Redis is unavailable
+    """
+    try:
+        return await get_redis().incr(key)
+    except RedisError as e:
+        logger.warning(f"Cache increment failed for {key}: {str(e)}")
+        return None
+
+
+async def cache_get_many(keys: list[str]) -> list[Optional[bytes]]:
+    """
+    Get several cached values with one MGET
+    
+    Returns:
+        Cached bytes per key, None for misses or if Redis is unavailable
+    """
+    if not keys:
+        return []
+    try:
+        return await get_redis().mget(keys)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {len(keys)} keys: {str(e)}")
+        return [None] * len(keys)
+
+
+async def cache_set_many(values: dict[str, bytes | str], expire: int) -> None:
+    """Store several values for `expire` seconds in one pipeline, ignoring Redis failures"""
+    if not values:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {len(values)} keys: {str(e)}")
+
+
+def cache_get_sync(key: str) -> Optional[bytes]:
+    """Blocking cache_get for code running in executor threads"""
+    try:
+        return get_sync_redis().get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+
+def cache_set_sync(key: str, value: bytes | str, expire: int) -> None:
+    """Blocking cache_set for code running in executor threads"""
+    try:
+        get_sync_redis().set(key, value, ex=expire)
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
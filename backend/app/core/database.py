@@ -2,17 +2,58 @@
 Database connection and session management
 """
 
+import asyncio
+import logging
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from app.core.config import settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from app.core.config import get_settings
+from app.core.vector import register_vector_codecs
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def _engine_options() -> dict:
+    """Pool and driver options for the async engine"""
+    if settings.DB_USE_PGBOUNCER:
+        # PgBouncer already pools connections, and in transaction mode a
+        # prepared statement may land on a different server connection
+        return {
+            "poolclass": NullPool,
+            "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+        }
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "connect_args": {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # Set to False to disable SQL query logging
-    future=True
+    future=True,
+    **_engine_options()
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _register_codecs(dbapi_connection, connection_record):
+    """Send and receive embeddings in pgvector's binary format"""
+    dbapi_connection.run_async(register_vector_codecs)
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -37,6 +78,35 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def warm_up_pool() -> None:
+    """
+    Open pool_size connections up front so requests never pay first-connect latency
+    """
+    if settings.DB_USE_PGBOUNCER:
+        return
+    
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.DB_POOL_SIZE)),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Database pool warm-up failed: {str(result)}")
+        else:
+            await result.close()
+
+
+async def check_database() -> bool:
+    """Return whether the database answers a trivial query"""
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.warning(f"Database readiness check failed: {str(e)}")
+        return False
+
+
 async def init_db():
     """
     Initialize database - create all tables
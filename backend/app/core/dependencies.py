@@ -2,21 +2,53 @@
 FastAPI dependencies for authentication and authorization
 """
 
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.services.auth_service import AuthService
-from app.models.user import User
+from app.models.user import User, UserRole
 
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached snapshot of an authenticated user, safe to share across sessions"""
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    role: UserRole
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=user.role,
+            created_at=user.created_at,
+        )
+
+
+# Authenticated users by ID, so most requests skip the users lookup. No
+# endpoint changes or deletes users, so the TTL alone bounds staleness; code
+# that later changes a user's role or deletes them must evict the entry here
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     """
     Get current authenticated user from JWT token
     
@@ -25,7 +57,7 @@ async def get_current_user(
         db: Database session
         
     Returns:
-        Current user object
+        Snapshot of the current user
         
     Raises:
         HTTPException: If token is invalid or user not found
@@ -48,8 +80,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id = int(user_id)
+    cached_user = _user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+    
     auth_service = AuthService(db)
-    user = await auth_service.get_current_user(int(user_id))
+    user = await auth_service.get_current_user(user_id)
     
     if user is None:
         raise HTTPException(
@@ -58,5 +95,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    current_user = CurrentUser.from_model(user)
+    _user_cache[user_id] = current_user
+    return current_user
 
@@ -2,15 +2,21 @@
 Security utilities for password hashing and JWT tokens
 """
 
+import asyncio
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from cachetools import TTLCache
 import bcrypt
-from app.core.config import settings
+import jwt
+from app.core.config import get_settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Decoded token payloads, keyed by a digest of the raw token
+_JWT_CACHE_TTL_SECONDS = 30
+_jwt_cache: TTLCache = TTLCache(maxsize=10000, ttl=_JWT_CACHE_TTL_SECONDS)
+_jwt_cache_lock = threading.Lock()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -24,20 +30,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    # Ensure password is a string
-    if not isinstance(plain_password, str):
-        plain_password = str(plain_password)
-    
-    # Convert to bytes for bcrypt
-    password_bytes = plain_password.encode('utf-8')
-    
-    # Bcrypt has a 72 byte limit, truncate if necessary
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
-    # Verify using bcrypt directly
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    # Bcrypt only uses the first 72 bytes of the password
+    password_bytes = plain_password.encode('utf-8')[:72]
+    return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
@@ -50,23 +45,39 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    # Ensure password is a string
-    if not isinstance(password, str):
-        password = str(password)
-    
-    # Convert to bytes for bcrypt
-    password_bytes = password.encode('utf-8')
+    # Bcrypt only uses the first 72 bytes of the password
+    password_bytes = password.encode('utf-8')[:72]
+    salt = bcrypt.gensalt(rounds=get_settings().BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password without blocking the event loop
     
-    # Bcrypt has a 72 byte limit, truncate if necessary
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
+    Bcrypt releases the GIL while hashing, so a worker thread is enough.
     
-    # Hash using bcrypt directly (more reliable)
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password
+        
+    Returns:
+        True if password matches, False otherwise
+    """
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """
+    Hash a password without blocking the event loop
     
-    # Return as string (passlib format compatible)
-    return hashed.decode('utf-8')
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+    """
+    return await asyncio.to_thread(get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -80,6 +91,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         Encoded JWT token
     """
+    settings = get_settings()
     to_encode = data.copy()
     
     if expires_delta:
@@ -97,15 +109,39 @@ def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode a JWT access token
     
+    Verified payloads are cached for a short time so repeated requests with
+    the same bearer token skip signature verification. A cached payload is
+    never returned past the token's own expiry.
+    
     Args:
         token: JWT token to decode
         
     Returns:
         Decoded token data or None if invalid
     """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+    now = time.time()
+    
+    with _jwt_cache_lock:
+        payload = _jwt_cache.get(key)
+    if payload is not None:
+        if payload["exp"] > now:
+            return payload
+        with _jwt_cache_lock:
+            _jwt_cache.pop(key, None)
+        return None
+    
     try:
+        settings = get_settings()
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
+    except jwt.PyJWTError:
         return None
+    
+    # Only cache tokens that carry an expiry which has not passed yet
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > now:
+        with _jwt_cache_lock:
+            _jwt_cache[key] = payload
+    
+    return payload
 
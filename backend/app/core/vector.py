@@ -0,0 +1,38 @@
+"""
+pgvector column type and asyncpg codecs for binary vector transfer
+"""
+
+import logging
+
+from pgvector.asyncpg import register_vector
+from pgvector.sqlalchemy import HALFVEC
+
+logger = logging.getLogger(__name__)
+
+
+class BinaryHALFVEC(HALFVEC):
+    """
+    HALFVEC column bound as raw values instead of '[x,y,...]' text
+
+    Requires the asyncpg codecs from register_vector_codecs, which encode the
+    list straight into pgvector's binary format (2 bytes per dimension).
+    """
+
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        return None
+
+
+async def register_vector_codecs(connection) -> None:
+    """
+    Register binary vector/halfvec codecs on a raw asyncpg connection
+
+    Args:
+        connection: asyncpg connection
+    """
+    try:
+        await register_vector(connection)
+    except ValueError as e:
+        # The vector extension is not installed in this database
+        logger.warning(f"pgvector codecs not registered: {str(e)}")
@@ -2,12 +2,17 @@
 Document model
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, BigInteger, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import relationship, deferred
 import enum
 from app.core.database import Base
+from app.core.vector import BinaryHALFVEC
+
+
+# Dimension of text-embedding-ada-002 vectors
+EMBEDDING_DIM = 1536
 
 
 class FileType(str, enum.Enum):
@@ -37,10 +42,23 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_type = Column(Enum(FileType), nullable=False)
     file_size = Column(BigInteger, nullable=False)  # bytes
+    content_sha256 = Column(String(64), nullable=True)  # hex digest of the stored file
     category = Column(String, nullable=True)
     summary = Column(Text, nullable=True)
     extracted_text = Column(Text, nullable=True)
-    embedding = Column(Vector(1536), nullable=True)  # OpenAI embedding dimension
+    embedding = Column(BinaryHALFVEC(EMBEDDING_DIM), nullable=True)  # OpenAI embedding dimension, stored as fp16
+    # Full-text search vector maintained by Postgres; title ranks above
+    # filename, which ranks above extracted_text
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(filename, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(extracted_text, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
     status = Column(Enum(DocumentStatus), default=DocumentStatus.UPLOADING, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -48,4 +66,33 @@ class Document(Base):
     # Relationships
     user = relationship("User", back_populates="documents")
     chat_messages = relationship("ChatMessage", back_populates="document", cascade="all, delete-orphan")
+    
+    # Mirrors the indexes created by the Alembic migrations
+    __table_args__ = (
+        Index(
+            "documents_title_trgm",
+            "title",
+            "filename",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops", "filename": "gin_trgm_ops"},
+        ),
+        Index("documents_tsv", "search_tsv", postgresql_using="gin"),
+        Index(
+            "documents_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+        Index("documents_user_created_idx", user_id, created_at.desc()),
+        Index("documents_user_sha256_idx", user_id, content_sha256),
+        Index("documents_user_status_created_idx", user_id, status, created_at.desc()),
+        Index("documents_user_filetype_created_idx", user_id, file_type, created_at.desc()),
+        Index(
+            "documents_user_status_embedded_idx",
+            "user_id",
+            "status",
+            postgresql_where=text("embedding IS NOT NULL"),
+        ),
+    )
 
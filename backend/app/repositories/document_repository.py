@@ -3,13 +3,56 @@ Document repository for database operations
 """
 
 import logging
+import numpy as np
+from types import MappingProxyType
 from typing import Optional, List
-from sqlalchemy import select, func, and_, or_, text
+from sqlalchemy import Row, bindparam, select, func, or_, text
+from sqlalchemy import delete as sa_delete, update as sa_update
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.document import Document, DocumentStatus, FileType
+from sqlalchemy.orm import load_only
+from app.core.config import get_settings
+from app.core.vector import BinaryHALFVEC
+from app.models.chat_message import ChatMessage
+from app.models.document import EMBEDDING_DIM, Document, DocumentStatus, FileType
 
 logger = logging.getLogger(__name__)
 
+# Columns the list endpoint may sort by; read-only so callers cannot widen it
+SORT_COLUMNS = MappingProxyType({
+    "created_at": Document.created_at,
+    "title": Document.title,
+    "file_type": Document.file_type,
+    "status": Document.status,
+})
+
+# Columns exposed by DocumentListItemResponse; pages skip the OCR text and summary
+LIST_COLUMNS = (
+    Document.id,
+    Document.user_id,
+    Document.title,
+    Document.filename,
+    Document.file_path,
+    Document.file_type,
+    Document.file_size,
+    Document.category,
+    Document.status,
+    Document.created_at,
+    Document.updated_at,
+)
+
+# Columns exposed by DocumentResponse; queries skip embedding and search_tsv
+RESPONSE_COLUMNS = LIST_COLUMNS + (Document.summary, Document.extracted_text)
+
+# Shortest search string the trigram indexes can serve
+MIN_TRIGRAM_SEARCH_LENGTH = 3
+
+# Most recent embedded documents scored by the in-process fallback search
+FALLBACK_SEARCH_CANDIDATES = 5000
+
+# Minimum HNSW candidate list size for vector search (pgvector default is 40)
+HNSW_EF_SEARCH = 40
+
 
 class DocumentRepository:
     """Document repository class"""
@@ -21,33 +64,86 @@ class DocumentRepository:
         """Create a new document record"""
         document = Document(**document_data)
         self.session.add(document)
+        # The INSERT returns server defaults (id, created_at), no refresh needed
         await self.session.commit()
-        await self.session.refresh(document)
         return document
 
-    async def get_by_id(self, document_id: int) -> Optional[Document]:
-        """Get document by ID"""
+    async def get_by_id(self, document_id: int, *columns) -> Optional[Document]:
+        """
+        Get document by ID
+        
+        Args:
+            document_id: Document ID
+            columns: Optional columns to load; all columns when omitted
+        """
+        query = select(Document).where(Document.id == document_id)
+        if columns:
+            query = query.options(load_only(*columns))
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_by_id_for_user(self, document_id: int, user_id: int) -> Optional[Document]:
+        """Get document by ID if it belongs to the given user"""
+        result = await self.session.execute(
+            select(Document).where(Document.id == document_id, Document.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def find_by_user_and_hash(self, user_id: int, content_sha256: str) -> Optional[Document]:
+        """Get the user's latest non-failed document with the given file hash"""
         result = await self.session.execute(
-            select(Document).where(Document.id == document_id)
+            select(Document)
+            .options(load_only(*RESPONSE_COLUMNS))
+            .where(
+                Document.user_id == user_id,
+                Document.content_sha256 == content_sha256,
+                Document.status != DocumentStatus.FAILED
+            )
+            .order_by(Document.id.desc())
+            .limit(1)
         )
         return result.scalar_one_or_none()
 
-    async def list_by_user(
+    async def get_many_for_user(self, document_ids: list[int], user_id: int) -> list[Document]:
+        """
+        Get several of a user's documents by ID, in the order given
+        
+        IDs that no longer exist or belong to another user are skipped.
+        """
+        if not document_ids:
+            return []
+        result = await self.session.execute(
+            select(Document)
+            .options(load_only(*RESPONSE_COLUMNS))
+            .where(Document.id.in_(document_ids), Document.user_id == user_id)
+        )
+        documents = {document.id: document for document in result.scalars()}
+        return [documents[document_id] for document_id in document_ids if document_id in documents]
+
+    async def get_version_for_user(self, document_id: int, user_id: int) -> Optional[Row]:
+        """
+        Get a document's updated_at without loading the row
+        
+        Returns:
+            Row with `updated_at`, or None if the user has no such document
+        """
+        result = await self.session.execute(
+            select(Document.updated_at).where(Document.id == document_id, Document.user_id == user_id)
+        )
+        return result.first()
+
+    def _apply_filters(
         self,
+        query,
         user_id: int,
-        limit: int = 20,
-        offset: int = 0,
         status: Optional[DocumentStatus] = None,
         file_type: Optional[FileType] = None,
         category: Optional[str] = None,
-        search: Optional[str] = None,
-        sort_by: str = "created_at",
-        sort_order: str = "desc"
-    ) -> List[Document]:
-        """List documents for a user with pagination, filtering, and sorting"""
-        query = select(Document).where(Document.user_id == user_id)
+        search: Optional[str] = None
+    ):
+        """Apply the user and optional list filters to a select statement"""
+        query = query.where(Document.user_id == user_id)
         
-        # Apply filters
         if status:
             query = query.where(Document.status == status)
         if file_type:
@@ -55,26 +151,33 @@ class DocumentRepository:
         if category:
             query = query.where(Document.category == category)
         if search:
-            search_filter = or_(
-                Document.title.ilike(f"%{search}%"),
-                Document.filename.ilike(f"%{search}%"),
-                Document.extracted_text.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
-        
-        # Apply sorting
-        sort_column = getattr(Document, sort_by, Document.created_at)
-        if sort_order.lower() == "asc":
-            query = query.order_by(sort_column.asc())
-        else:
-            query = query.order_by(sort_column.desc())
+            # Whole-word matches go through the search_tsv GIN index; the
+            # trigram index on title/filename serves substring matches
+            text_match = Document.search_tsv.op("@@")(func.plainto_tsquery("simple", search))
+            if len(search) < MIN_TRIGRAM_SEARCH_LENGTH:
+                # pg_trgm cannot use the index below 3 characters, so ILIKE
+                # would fall back to a sequential scan
+                query = query.where(text_match)
+            else:
+                query = query.where(or_(
+                    Document.title.ilike(f"%{search}%"),
+                    Document.filename.ilike(f"%{search}%"),
+                    text_match
+                ))
         
-        # Apply pagination
-        query = query.limit(limit).offset(offset)
+        return query
+
+    def _apply_sorting(self, query, sort_by: str, sort_order: str, search: Optional[str] = None):
+        """Apply ordering to a select statement"""
+        if sort_by == "relevance" and search:
+            rank = func.ts_rank_cd(Document.search_tsv, func.plainto_tsquery("simple", search))
+            return query.order_by(rank.desc(), Document.created_at.desc())
         
-        result = await self.session.execute(query)
-        return result.scalars().all()
-    
+        sort_column = SORT_COLUMNS.get(sort_by, Document.created_at)
+        if sort_order.lower() == "asc":
+            return query.order_by(sort_column.asc())
+        return query.order_by(sort_column.desc())
+
     async def count_by_user(
         self,
         user_id: int,
@@ -84,53 +187,108 @@ class DocumentRepository:
         search: Optional[str] = None
     ) -> int:
         """Count documents for a user with filters"""
-        query = select(func.count(Document.id)).where(Document.user_id == user_id)
-        
-        # Apply filters
-        if status:
-            query = query.where(Document.status == status)
-        if file_type:
-            query = query.where(Document.file_type == file_type)
-        if category:
-            query = query.where(Document.category == category)
-        if search:
-            search_filter = or_(
-                Document.title.ilike(f"%{search}%"),
-                Document.filename.ilike(f"%{search}%"),
-                Document.extracted_text.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
+        query = self._apply_filters(
+            select(func.count(Document.id)), user_id, status, file_type, category, search
+        )
         
         result = await self.session.execute(query)
         return result.scalar_one()
 
-    async def update(self, document_id: int, update_data: dict) -> Optional[Document]:
-        """Update document by ID"""
-        document = await self.get_by_id(document_id)
-        if not document:
-            return None
+    async def list_and_count_by_user(
+        self,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        status: Optional[DocumentStatus] = None,
+        file_type: Optional[FileType] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc"
+    ) -> tuple[List[Document], int]:
+        """
+        List a page of documents together with the total match count
         
-        for key, value in update_data.items():
-            setattr(document, key, value)
+        The total is computed with COUNT(*) OVER () so the page and the count
+        come back in a single round-trip.
         
+        Returns:
+            Tuple of (documents, total)
+        """
+        query = self._apply_filters(
+            select(Document, func.count().over().label("total"))
+            .options(load_only(*LIST_COLUMNS)),
+            user_id, status, file_type, category, search
+        )
+        query = self._apply_sorting(query, sort_by, sort_order, search)
+        query = query.limit(limit).offset(offset)
+        
+        result = await self.session.execute(query)
+        rows = result.all()
+        
+        if rows:
+            return [row.Document for row in rows], rows[0].total
+        
+        # An empty page past the end carries no window count, fall back to COUNT
+        if offset > 0:
+            total = await self.count_by_user(user_id, status, file_type, category, search)
+            return [], total
+        return [], 0
+
+    async def update(self, document_id: int, update_data: dict) -> Optional[Document]:
+        """Update document by ID with a single UPDATE ... RETURNING"""
+        result = await self.session.execute(
+            sa_update(Document)
+            .where(Document.id == document_id)
+            .values(**update_data)
+            .returning(Document),
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        document = result.scalar_one_or_none()
         await self.session.commit()
-        await self.session.refresh(document)
         return document
     
     async def delete(self, document_id: int) -> bool:
-        """Delete document by ID"""
-        document = await self.get_by_id(document_id)
-        if not document:
-            return False
-        
-        await self.session.delete(document)
+        """Delete document by ID along with its chat messages"""
+        # chat_messages has no ON DELETE CASCADE, clear them in the same transaction
+        await self.session.execute(
+            sa_delete(ChatMessage).where(ChatMessage.document_id == document_id),
+            execution_options={"synchronize_session": False}
+        )
+        result = await self.session.execute(
+            sa_delete(Document).where(Document.id == document_id).returning(Document.id),
+            execution_options={"synchronize_session": False}
+        )
+        deleted = result.scalar_one_or_none() is not None
         await self.session.commit()
-        return True
+        return deleted
+    
+    async def _configure_hnsw_scan(self, limit: int) -> None:
+        """
+        Set HNSW search options for the current transaction
+        
+        The candidate list grows with the requested limit. With iterative
+        scans enabled, pgvector keeps walking the graph when the user_id and
+        status filters discard candidates, instead of returning a short page.
+        """
+        params = {"ef_search": str(max(HNSW_EF_SEARCH, limit * 2))}
+        if get_settings().PGVECTOR_ITERATIVE_SCAN:
+            await self.session.execute(
+                text(
+                    "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+                    "set_config('hnsw.iterative_scan', 'strict_order', true)"
+                ),
+                params
+            )
+        else:
+            await self.session.execute(
+                text("SELECT set_config('hnsw.ef_search', :ef_search, true)"), params
+            )
     
     async def semantic_search(
         self,
         user_id: int,
-        query_embedding: list[float],
+        query_embedding: np.ndarray,
         limit: int = 10,
         threshold: float = 0.7
     ) -> List[tuple[Document, float]]:
@@ -147,104 +305,95 @@ class DocumentRepository:
             List of tuples (document, similarity_score)
         """
         try:
-            # Try to use pgvector for semantic search
-            import numpy as np
-            from pgvector.sqlalchemy import Vector
+            await self._configure_hnsw_scan(limit)
             
-            # Convert list to string format for pgvector
-            query_vec_str = '[' + ','.join(map(str, query_embedding)) + ']'
-            
-            # Use raw SQL for pgvector cosine similarity
             # 1 - cosine_distance = cosine_similarity
-            sql_query = text("""
-                SELECT id, user_id, title, filename, file_path, file_type, file_size,
-                       category, summary, extracted_text, status, created_at, updated_at,
-                       1 - (embedding <=> CAST(:query_vec AS vector)) AS similarity
-                FROM documents
-                WHERE user_id = :user_id
-                  AND embedding IS NOT NULL
-                  AND status = 'completed'
-                  AND 1 - (embedding <=> CAST(:query_vec AS vector)) >= :threshold
-                ORDER BY embedding <=> CAST(:query_vec AS vector)
-                LIMIT :limit
-            """)
-            
-            result = await self.session.execute(
-                sql_query,
-                {
-                    "query_vec": query_vec_str,
-                    "user_id": user_id,
-                    "threshold": threshold,
-                    "limit": limit
-                }
+            distance = Document.embedding.cosine_distance(
+                bindparam("query_vec", query_embedding, type_=BinaryHALFVEC(EMBEDDING_DIM))
             )
-            
-            results = []
-            for row in result:
-                # Reconstruct document object from row
-                # Handle enum types properly
-                file_type_enum = FileType(row.file_type) if isinstance(row.file_type, str) else row.file_type
-                status_enum = DocumentStatus(row.status) if isinstance(row.status, str) else row.status
-                
-                doc = Document(
-                    id=row.id,
-                    user_id=row.user_id,
-                    title=row.title,
-                    filename=row.filename,
-                    file_path=row.file_path,
-                    file_type=file_type_enum,
-                    file_size=row.file_size,
-                    category=row.category,
-                    summary=row.summary,
-                    extracted_text=row.extracted_text,
-                    status=status_enum,
-                    created_at=row.created_at,
-                    updated_at=row.updated_at
+            similarity = (1 - distance).label("similarity")
+            query = (
+                select(Document, similarity)
+                .options(load_only(*RESPONSE_COLUMNS))
+                .where(
+                    Document.user_id == user_id,
+                    Document.embedding.is_not(None),
+                    Document.status == DocumentStatus.COMPLETED,
+                    similarity >= threshold
                 )
-                similarity = float(row.similarity)
-                results.append((doc, similarity))
+                .order_by(distance)
+                .limit(limit)
+            )
             
-            return results
+            result = await self.session.execute(query)
+            return [(row.Document, float(row.similarity)) for row in result]
             
-        except Exception as e:
-            # Fallback to text-based search if pgvector is not available
-            logger.warning(f"pgvector search failed: {str(e)}", exc_info=True)
-            # Fallback: Use text search instead
+        except DBAPIError as e:
+            # The pgvector extension is missing or the column is not a vector
+            # type; the failed statement aborted the transaction, so roll back
+            # before running the fallback query
+            logger.warning(
+                f"pgvector search failed, falling back to a full scan of the user's documents: {str(e)}"
+            )
+            await self.session.rollback()
             try:
-                return await self._fallback_text_search(user_id, query_embedding, limit)
-            except Exception as fallback_error:
+                return await self._fallback_vector_search(user_id, query_embedding, limit, threshold)
+            except DBAPIError as fallback_error:
                 logger.error(f"Fallback search also failed: {str(fallback_error)}", exc_info=True)
                 # Return empty results if both fail
                 return []
     
-    async def _fallback_text_search(
+    async def _fallback_vector_search(
         self,
         user_id: int,
-        query_embedding: list[float],
-        limit: int
+        query_embedding: np.ndarray,
+        limit: int,
+        threshold: float
     ) -> List[tuple[Document, float]]:
         """
-        Fallback text-based search when pgvector is not available
-        Returns all completed documents (since we can't do vector similarity without pgvector)
+        Fallback search when the pgvector operators are not usable
+        
+        Scores the user's most recent embedded documents against the query
+        with one vectorised NumPy pass instead of in the database.
         """
-        logger.info("Using fallback text search (pgvector not available)")
+        logger.info("Using fallback vector search (pgvector operators not available)")
         
-        # Since we can't do vector similarity, return all completed documents
-        # In a real scenario, you might want to use text-based search or
-        # implement cosine similarity in Python (slower but works)
-        query = select(Document).where(
-            and_(
+        candidates = (await self.session.execute(
+            select(Document.id, Document.embedding)
+            .where(
                 Document.user_id == user_id,
-                Document.status == DocumentStatus.COMPLETED,
-                Document.extracted_text.isnot(None)
+                Document.embedding.is_not(None),
+                Document.status == DocumentStatus.COMPLETED
             )
-        ).order_by(Document.created_at.desc()).limit(limit)
+            .order_by(Document.created_at.desc())
+            .limit(FALLBACK_SEARCH_CANDIDATES)
+        )).all()
+        if not candidates:
+            return []
         
-        result = await self.session.execute(query)
-        documents = result.scalars().all()
+        matrix = np.stack([row.embedding.to_numpy() for row in candidates]).astype(np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = (matrix @ query) / np.where(norms == 0, 1, norms)
         
-        # Return with a default similarity score of 0.5
-        # (since we can't calculate actual similarity without pgvector)
-        return [(doc, 0.5) for doc in documents]
-
-
+        if len(candidates) > limit:
+            top = np.argpartition(-similarities, limit)[:limit]
+        else:
+            top = range(len(candidates))
+        scores = {
+            candidates[i].id: float(similarities[i])
+            for i in top
+            if similarities[i] >= threshold
+        }
+        if not scores:
+            return []
+        
+        result = await self.session.execute(
+            select(Document).options(load_only(*RESPONSE_COLUMNS)).where(Document.id.in_(scores))
+        )
+        documents = result.scalars().all()
+        return sorted(
+            ((document, scores[document.id]) for document in documents),
+            key=lambda item: item[1],
+            reverse=True
+        )
@@ -3,7 +3,7 @@ User repository for database operations
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from typing import Optional
 from app.models.user import User
 
@@ -32,8 +32,8 @@ class UserRepository:
         """
         user = User(**user_data)
         self.session.add(user)
+        # The INSERT returns server defaults (id, created_at), no refresh needed
         await self.session.commit()
-        await self.session.refresh(user)
         return user
     
     async def get_by_id(self, user_id: int) -> Optional[User]:
@@ -76,6 +76,8 @@ class UserRepository:
         Returns:
             True if email exists, False otherwise
         """
-        user = await self.get_by_email(email)
-        return user is not None
+        result = await self.session.execute(
+            select(exists().where(User.email == email))
+        )
+        return result.scalar()
 
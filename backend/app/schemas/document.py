@@ -4,11 +4,11 @@ Document schemas
 
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
-class DocumentResponse(BaseModel):
-    """Document response schema"""
+class DocumentListItemResponse(BaseModel):
+    """Document list item schema, without the summary and extracted text"""
 
     id: int
     user_id: int
@@ -18,14 +18,18 @@ class DocumentResponse(BaseModel):
     file_type: str
     file_size: int
     category: Optional[str] = None
-    summary: Optional[str] = None
-    extracted_text: Optional[str] = None
     status: str
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentResponse(DocumentListItemResponse):
+    """Document response schema"""
+
+    summary: Optional[str] = None
+    extracted_text: Optional[str] = None
 
 
 class DocumentUploadResponse(BaseModel):
@@ -45,7 +49,7 @@ class DocumentUpdateRequest(BaseModel):
 class DocumentListResponse(BaseModel):
     """Document list response with pagination"""
 
-    documents: list[DocumentResponse]
+    documents: list[DocumentListItemResponse]
     total: int
     limit: int
     offset: int
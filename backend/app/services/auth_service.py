@@ -6,8 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import timedelta
 from app.repositories.user_repository import UserRepository
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.core.config import settings
+from app.core.security import averify_password, aget_password_hash, create_access_token
 from app.schemas.auth import UserSignupRequest, UserLoginRequest
 from app.models.user import User
 
@@ -43,7 +42,7 @@ class AuthService:
             raise ValueError("Email already registered")
         
         # Hash password
-        password_hash = get_password_hash(signup_data.password)
+        password_hash = await aget_password_hash(signup_data.password)
         
         # Create user data
         user_data = {
@@ -83,7 +82,7 @@ class AuthService:
             raise ValueError("Invalid email or password")
         
         # Verify password
-        if not verify_password(login_data.password, user.password_hash):
+        if not await averify_password(login_data.password, user.password_hash):
             raise ValueError("Invalid email or password")
         
         # Create access token
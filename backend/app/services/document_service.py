@@ -3,26 +3,68 @@ Document service for handling business logic
 """
 
 import os
+import json
+import hashlib
 import logging
 import asyncio
 from pathlib import Path
-from typing import Optional
-from uuid import uuid4
+from typing import BinaryIO, Optional
 
-import aiofiles
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.cache import cache_get, cache_incr, cache_set
+from app.core.config import get_settings
 from app.core.database import AsyncSessionLocal
+from app.core.dependencies import CurrentUser
 from app.models.document import Document, DocumentStatus, FileType
-from app.models.user import User
 from app.repositories.document_repository import DocumentRepository
 from app.services.ocr_service import ocr_service
-from app.services.embedding_service import embedding_service
+from app.services.embedding_service import build_document_embedding_text, embedding_service
+from app.services.search_history_service import search_history_buffer
 
 logger = logging.getLogger(__name__)
 
+# Read/write size when copying uploads to disk
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024  # 4MB
+
+_EXTENSION_TO_FILE_TYPE: dict[str, FileType] = {
+    "pdf": FileType.PDF,
+    "png": FileType.IMAGE,
+    "jpg": FileType.IMAGE,
+    "jpeg": FileType.IMAGE,
+    "docx": FileType.DOCX,
+}
+
+
+# Recent semantic search results are cached in Redis as (document id,
+# similarity) pairs, under a per-user version that every change to the
+# user's documents bumps, including OCR completions in the Celery worker
+_SEARCH_CACHE_TTL_SECONDS = 300
+
+
+def _search_version_key(user_id: int) -> str:
+    """Redis counter bumped whenever a user's searchable documents change"""
+    return f"docpanel:search_version:{user_id}"
+
+
+def _search_cache_key(user_id: int, version: int, query: str, limit: int, threshold: float) -> str:
+    """Build the search result cache key for a normalized query"""
+    normalized = " ".join(query.lower().split())
+    digest = hashlib.blake2b(
+        f"{normalized}:{limit}:{threshold}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return f"docpanel:search:{user_id}:{version}:{digest}"
+
+
+async def invalidate_search_cache(user_id: int) -> None:
+    """Retire cached search results for a user (call after changing their documents)"""
+    await cache_incr(_search_version_key(user_id))
+
+
+# Settings are frozen, so the allowed set only needs building once
+_ALLOWED_EXTENSIONS = frozenset(file_type.lower() for file_type in get_settings().ALLOWED_FILE_TYPES)
+
 
 class DocumentService:
     """Document service class"""
@@ -34,11 +76,11 @@ class DocumentService:
     async def upload_document(
         self,
         *,
-        user: User,
+        user: CurrentUser,
         title: str,
         file: UploadFile,
         category: Optional[str] = None,
-    ):
+    ) -> tuple[Document, bool]:
         """
         Handle document upload
 
@@ -49,18 +91,32 @@ class DocumentService:
             category: Optional document category
 
         Returns:
-            Created document instance
+            Tuple of (document, created); created is False when the user had
+            already uploaded the same file and the existing document is
+            returned unchanged, without the new title and category
         """
         self._validate_file_extension(file)
         file_extension = self._get_file_extension(file)
         file_type = self._map_extension_to_file_type(file_extension)
 
-        upload_path, relative_path, stored_filename = await self._save_file(
+        staged_path, relative_path, stored_filename, file_size, content_sha256 = await self._save_file(
             user_id=user.id,
             file=file,
             extension=file_extension,
         )
 
+        # Same bytes already uploaded by this user, reuse its OCR and embedding;
+        # the staged copy is only moved to its final name for new documents
+        try:
+            existing = await self.repository.find_by_user_and_hash(user.id, content_sha256)
+            if existing:
+                staged_path.unlink(missing_ok=True)
+                return existing, False
+            await asyncio.to_thread(os.replace, staged_path, Path(get_settings().UPLOAD_DIR) / relative_path)
+        except BaseException:
+            staged_path.unlink(missing_ok=True)
+            raise
+
         original_filename = file.filename or stored_filename
 
         document_data = {
@@ -69,42 +125,49 @@ class DocumentService:
             "filename": original_filename,
             "file_path": str(relative_path),
             "file_type": file_type,
-            "file_size": upload_path.stat().st_size,
+            "file_size": file_size,
+            "content_sha256": content_sha256,
             "category": category,
             "status": DocumentStatus.PROCESSING,
         }
 
         document = await self.repository.create(document_data)
-        return document
+        await invalidate_search_cache(user.id)
+        return document, True
 
-    async def process_ocr(self, document_id: int) -> None:
+    async def process_ocr(self, document_id: int, use_cache: bool = True) -> None:
         """
         Process OCR for a document asynchronously
         
         Args:
             document_id: Document ID to process
+            use_cache: Reuse cached OCR results; False forces a fresh extraction
         """
         logger.info(f"Starting OCR processing for document ID: {document_id}")
         
         # Create new session for background task
         async with AsyncSessionLocal() as session:
+            repository = DocumentRepository(session)
             try:
-                repository = DocumentRepository(session)
-                
                 # Get document
-                document = await repository.get_by_id(document_id)
+                # Skip the previous OCR text and embedding when reprocessing
+                document = await repository.get_by_id(
+                    document_id,
+                    Document.user_id,
+                    Document.title,
+                    Document.file_path,
+                    Document.file_type,
+                    Document.content_sha256
+                )
                 if not document:
                     logger.warning(f"Document {document_id} not found")
                     return
                 
                 logger.info(f"Document found: {document.title}, type: {document.file_type}")
                 
-                # Update status to processing
-                await repository.update(document_id, {"status": DocumentStatus.PROCESSING})
-                logger.info(f"Document {document_id} status updated to PROCESSING")
-                
+                # Status is already PROCESSING, set by upload or the reprocess endpoint
                 # Get full file path
-                file_path = Path(settings.UPLOAD_DIR) / document.file_path
+                file_path = Path(get_settings().UPLOAD_DIR) / document.file_path
                 logger.info(f"Looking for file at: {file_path}")
                 
                 if not file_path.exists():
@@ -121,15 +184,17 @@ class DocumentService:
                 
                 logger.info(f"File found, starting OCR extraction...")
                 
-                # Extract text using OCR (run in thread pool to avoid blocking)
+                # Extract text using OCR (runs on the dedicated OCR pool)
                 try:
-                    extracted_text = await asyncio.to_thread(
-                        ocr_service.extract_text_sync,
+                    extracted_text = await ocr_service.extract_text(
                         file_path=file_path,
-                        file_type=document.file_type
+                        file_type=document.file_type,
+                        content_sha256=document.content_sha256,
+                        use_cache=use_cache
                     )
                     
-                    if not extracted_text or len(extracted_text.strip()) == 0:
+                    ocr_succeeded = bool(extracted_text and extracted_text.strip())
+                    if not ocr_succeeded:
                         extracted_text = "No text could be extracted from the document."
                         logger.warning(f"No text extracted from document {document_id}")
                     
@@ -137,12 +202,14 @@ class DocumentService:
                     
                     # Generate embedding for semantic search
                     embedding = None
-                    if embedding_service.is_available():
+                    if not ocr_succeeded:
+                        logger.info(f"Skipping embedding for document {document_id}, no text extracted")
+                    elif embedding_service.is_available():
                         logger.info(f"Generating embedding for document {document_id}")
                         # Use title + extracted text for better semantic search
-                        text_for_embedding = f"{document.title}\n\n{extracted_text}"
+                        text_for_embedding = build_document_embedding_text(document.title, extracted_text)
                         embedding = await embedding_service.generate_embedding(text_for_embedding)
-                        if embedding:
+                        if embedding is not None:
                             logger.info(f"Embedding generated for document {document_id}")
                         else:
                             logger.warning(f"Failed to generate embedding for document {document_id}")
@@ -154,10 +221,11 @@ class DocumentService:
                         "extracted_text": extracted_text,
                         "status": DocumentStatus.COMPLETED
                     }
-                    if embedding:
+                    if embedding is not None:
                         update_data["embedding"] = embedding
                     
                     await repository.update(document_id, update_data)
+                    await invalidate_search_cache(document.user_id)
                     logger.info(f"Document {document_id} status updated to COMPLETED")
                     
                 except Exception as ocr_error:
@@ -173,25 +241,23 @@ class DocumentService:
                     
             except Exception as e:
                 logger.error(f"Unexpected error processing OCR for document {document_id}: {str(e)}", exc_info=True)
-                # Try to update status even if there's an error
+                # Try to update status even if there's an error, on the same connection
                 try:
-                    async with AsyncSessionLocal() as error_session:
-                        error_repo = DocumentRepository(error_session)
-                        await error_repo.update(
-                            document_id,
-                            {
-                                "status": DocumentStatus.FAILED,
-                                "extracted_text": f"Unexpected error: {str(e)}"
-                            }
-                        )
+                    await session.rollback()
+                    await repository.update(
+                        document_id,
+                        {
+                            "status": DocumentStatus.FAILED,
+                            "extracted_text": f"Unexpected error: {str(e)}"
+                        }
+                    )
                 except Exception as update_error:
                     logger.error(f"Failed to update document status after error: {str(update_error)}")
 
     def _validate_file_extension(self, file: UploadFile) -> None:
         """Validate file extension based on allowed types"""
         extension = self._get_file_extension(file)
-        allowed_types = {file_type.lower() for file_type in settings.ALLOWED_FILE_TYPES}
-        if extension not in allowed_types:
+        if extension not in _ALLOWED_EXTENSIONS:
             raise ValueError(f"Unsupported file type: .{extension}")
 
     def _get_file_extension(self, file: UploadFile) -> str:
@@ -202,51 +268,122 @@ class DocumentService:
 
     def _map_extension_to_file_type(self, extension: str) -> FileType:
         """Map file extension to FileType enum"""
-        if extension == "pdf":
-            return FileType.PDF
-        if extension in {"png", "jpg", "jpeg"}:
-            return FileType.IMAGE
-        if extension == "docx":
-            return FileType.DOCX
-        raise ValueError(f"Unsupported file type: .{extension}")
-
-    async def _save_file(self, user_id: int, file: UploadFile, extension: str) -> tuple[Path, Path, str]:
-        """Save uploaded file to disk and return file path and filename"""
-        upload_dir = Path(settings.UPLOAD_DIR) / str(user_id)
-        os.makedirs(upload_dir, exist_ok=True)
+        try:
+            return _EXTENSION_TO_FILE_TYPE[extension]
+        except KeyError:
+            raise ValueError(f"Unsupported file type: .{extension}") from None
+
+    async def _save_file(self, user_id: int, file: UploadFile, extension: str) -> tuple[Path, Path, str, int, str]:
+        """
+        Stream uploaded file to a staging file next to its final location
+        
+        Returns:
+            Tuple of (staging path, final relative path, filename, size, SHA-256 hex digest)
+        """
+        settings = get_settings()
+        max_size = settings.MAX_FILE_SIZE
+
+        # Starlette records the size while parsing the form, reject before copying
+        if file.size is not None and file.size > max_size:
+            raise ValueError(self._file_too_large_message(max_size))
 
-        unique_filename = f"{uuid4().hex}.{extension}"
-        file_path = upload_dir / unique_filename
+        upload_dir = Path(settings.UPLOAD_DIR) / str(user_id)
+        unique_filename = f"{os.urandom(16).hex()}.{extension}"
+        # Same directory as the final file, so moving it there is a rename
+        file_path = upload_dir / f"{unique_filename}.part"
         relative_path = Path(str(user_id)) / unique_filename
 
         # Reset file pointer to start
         await file.seek(0)
 
+        try:
+            file_size, content_sha256 = await asyncio.to_thread(
+                self._copy_upload, file.file, file_path, max_size
+            )
+        except ValueError:
+            file_path.unlink(missing_ok=True)
+            raise
+
+        return file_path, relative_path, unique_filename, file_size, content_sha256
+
+    def _copy_upload(self, source: BinaryIO, destination: Path, max_size: int) -> tuple[int, str]:
+        """
+        Copy the spooled upload to disk, hashing it on the way
+        
+        Runs in a single worker thread and reuses one buffer, instead of
+        hopping to the thread pool for every chunk read and write. The
+        destination directory is (re)created here on every upload, so one
+        removed externally does not break later uploads.
+        
+        Returns:
+            Tuple of (bytes written, SHA-256 hex digest of the file contents)
+        """
+        buffer = bytearray(UPLOAD_CHUNK_SIZE)
+        view = memoryview(buffer)
+        content_hash = hashlib.sha256()
         total_size = 0
-        max_size = settings.MAX_FILE_SIZE
-        chunk_size = 1024 * 1024  # 1MB
 
-        async with aiofiles.open(file_path, "wb") as output_file:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with open(destination, "wb") as output_file:
             while True:
-                chunk = await file.read(chunk_size)
-                if not chunk:
+                read = source.readinto(buffer)
+                if not read:
                     break
 
-                total_size += len(chunk)
+                total_size += read
                 if total_size > max_size:
-                    await output_file.close()
-                    if file_path.exists():
-                        file_path.unlink(missing_ok=True)
-                    raise ValueError(
-                        f"File size exceeds the maximum allowed size of {max_size // (1024 * 1024)} MB"
-                    )
+                    raise ValueError(self._file_too_large_message(max_size))
 
-                await output_file.write(chunk)
+                chunk = view[:read]
+                content_hash.update(chunk)
+                output_file.write(chunk)
 
-        # Reset file pointer for future operations if needed
-        await file.seek(0)
+        return total_size, content_hash.hexdigest()
 
-        return file_path, relative_path, unique_filename
+    def _file_too_large_message(self, max_size: int) -> str:
+        """Error message for uploads over MAX_FILE_SIZE"""
+        return f"File size exceeds the maximum allowed size of {max_size // (1024 * 1024)} MB"
+    
+    async def list_documents(
+        self,
+        user_id: int,
+        limit: int = 20,
+        offset: int = 0,
+        status: Optional[DocumentStatus] = None,
+        file_type: Optional[FileType] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc"
+    ) -> tuple[list[Document], int]:
+        """
+        List a page of the user's documents with the total match count
+        
+        Args:
+            user_id: User ID
+            limit: Number of documents to return
+            offset: Number of documents to skip
+            status: Optional status filter
+            file_type: Optional file type filter
+            category: Optional category filter
+            search: Optional search text
+            sort_by: Sort field
+            sort_order: Sort order (asc, desc)
+        
+        Returns:
+            Tuple of (documents, total)
+        """
+        return await self.repository.list_and_count_by_user(
+            user_id=user_id,
+            limit=limit,
+            offset=offset,
+            status=status,
+            file_type=file_type,
+            category=category,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order
+        )
     
     async def update_document(
         self,
@@ -280,7 +417,9 @@ class DocumentService:
         if not filtered_data:
             return document
         
-        return await self.repository.update(document_id, filtered_data)
+        document = await self.repository.update(document_id, filtered_data)
+        await invalidate_search_cache(user_id)
+        return document
     
     async def delete_document(self, document_id: int, user_id: int) -> bool:
         """
@@ -293,7 +432,7 @@ class DocumentService:
         Returns:
             True if deleted, False if not found
         """
-        document = await self.repository.get_by_id(document_id)
+        document = await self.repository.get_by_id(document_id, Document.user_id, Document.file_path)
         if not document:
             return False
         
@@ -302,7 +441,7 @@ class DocumentService:
             raise ValueError("Access denied: Document does not belong to user")
         
         # Delete file from disk
-        file_path = Path(settings.UPLOAD_DIR) / document.file_path
+        file_path = Path(get_settings().UPLOAD_DIR) / document.file_path
         if file_path.exists():
             try:
                 file_path.unlink()
@@ -310,7 +449,9 @@ class DocumentService:
                 logger.warning(f"Failed to delete file {file_path}: {str(e)}")
         
         # Delete from database
-        return await self.repository.delete(document_id)
+        deleted = await self.repository.delete(document_id)
+        await invalidate_search_cache(user_id)
+        return deleted
     
     async def semantic_search(
         self,
@@ -331,13 +472,23 @@ class DocumentService:
         Returns:
             List of tuples (document, similarity_score)
         """
+        version = int(await cache_get(_search_version_key(user_id)) or 0)
+        cache_key = _search_cache_key(user_id, version, query, limit, threshold)
+        cached_results = await cache_get(cache_key)
+        if cached_results is not None:
+            similarities = dict(json.loads(cached_results))
+            documents = await self.repository.get_many_for_user(list(similarities), user_id)
+            results = [(document, similarities[document.id]) for document in documents]
+            search_history_buffer.put_nowait(user_id, query, len(results))
+            return results
+        
         # Generate embedding for query
         if not embedding_service.is_available():
             logger.warning("Embedding service not available, cannot perform semantic search")
             return []
         
-        query_embedding = await embedding_service.generate_embedding(query)
-        if not query_embedding:
+        query_embedding = await embedding_service.embed_query(query)
+        if query_embedding is None:
             logger.warning("Failed to generate embedding for search query")
             return []
         
@@ -349,6 +500,12 @@ class DocumentService:
             threshold=threshold
         )
         
+        await cache_set(
+            cache_key,
+            json.dumps([[document.id, similarity] for document, similarity in results]),
+            expire=_SEARCH_CACHE_TTL_SECONDS
+        )
+        search_history_buffer.put_nowait(user_id, query, len(results))
         return results
 
 
@@ -2,29 +2,180 @@
 Embedding service for generating vector embeddings using OpenAI
 """
 
+import asyncio
+import hashlib
 import logging
 from typing import Optional
 import numpy as np
 
-from openai import OpenAI
-from app.core.config import settings
+from cachetools import LRUCache
+from openai import AsyncOpenAI, BadRequestError
+from app.core.cache import cache_get_many, cache_set_many
+from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# text-embedding-ada-002 has a limit of 8191 tokens
+# Approximate: 1 token ≈ 4 characters, so max ~32k characters
+MAX_EMBEDDING_CHARS = 30000
+
+# The embeddings endpoint also caps the tokens of a whole request (300k);
+# batches stay well under it since the 4 characters per token estimate is
+# optimistic for non-English text
+MAX_BATCH_TOKENS = 200000
+
+# Embeddings are cached in Redis by a hash of the exact text sent to the API
+EMBEDDING_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+def build_document_embedding_text(title: str, extracted_text: str) -> str:
+    """
+    Combine a document's title and text into embedding input
+
+    The text is cut to the API budget before concatenating, so large OCR
+    results are not copied whole just to be truncated afterwards.
+    """
+    prefix = f"{title}\n\n"
+    return prefix + extracted_text[:max(MAX_EMBEDDING_CHARS - len(prefix), 0)]
+
+
+def _estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count of a text as it will be sent to the API"""
+    return min(len(text or ""), MAX_EMBEDDING_CHARS) // 4 + 1
+
+
+def _embedding_cache_key(text: str) -> str:
+    """Redis key for the embedding of an already truncated text"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"docpanel:emb:{EMBEDDING_MODEL}:{digest}"
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into batched API calls
+
+    Requests are collected until either `max_batch_size` items or about
+    `max_batch_tokens` tokens are queued, or `flush_interval` seconds have
+    passed since the first one, then sent as a single embeddings request.
+    """
+
+    def __init__(
+        self,
+        service: "EmbeddingService",
+        max_batch_size: int = 64,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        flush_interval: float = 0.01
+    ):
+        self._service = service
+        self._max_batch_size = max_batch_size
+        self._max_batch_tokens = max_batch_tokens
+        self._flush_interval = flush_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Item that did not fit the token budget, first in the next batch
+        self._held: Optional[tuple] = None
+
+    def _ensure_worker(self) -> None:
+        """Start the flush loop on the running event loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._held = None
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Queue a text and wait for its embedding"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect queued texts into batches and resolve their futures"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item, self._held = self._held or await self._queue.get(), None
+            batch = [item]
+            tokens = _estimate_tokens(item[0])
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                tokens += _estimate_tokens(item[0])
+                if tokens > self._max_batch_tokens:
+                    self._held = item
+                    break
+                batch.append(item)
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await self._service.generate_embeddings_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
 
 class EmbeddingService:
     """Service for generating text embeddings"""
 
     def __init__(self):
         """Initialize embedding service"""
-        self.client = None
-        if settings.OPENAI_API_KEY:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            logger.info("OpenAI client initialized")
+        settings = get_settings()
+        self._api_key = settings.OPENAI_API_KEY or None
+        # AsyncOpenAI's connection pool belongs to the loop it was first used
+        # on; Celery tasks each run their own loop, so clients are per loop
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        if self._api_key:
+            logger.info("OpenAI client configured")
         else:
             logger.warning("OpenAI API key not configured. Embeddings will not be generated.")
 
-    async def generate_embedding(self, text: str) -> Optional[list[float]]:
+        self.batcher = EmbeddingBatcher(self)
+        # Search queries repeat a lot in the UI
+        self._query_cache: LRUCache = LRUCache(maxsize=1024)
+
+    def _get_client(self) -> AsyncOpenAI:
+        """Return the AsyncOpenAI client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = AsyncOpenAI(api_key=self._api_key)
+            self._client_loop = loop
+        return self._client
+
+    def _prepare_text(self, text: str) -> Optional[str]:
+        """Validate and truncate text for the embeddings API"""
+        if not text:
+            logger.warning("Empty text provided for embedding generation")
+            return None
+
+        # Truncate first (OpenAI has token limits), so the whitespace check
+        # below never scans more than the part that will be sent
+        if len(text) > MAX_EMBEDDING_CHARS:
+            text = text[:MAX_EMBEDDING_CHARS]
+            logger.info(f"Text truncated to {MAX_EMBEDDING_CHARS} characters for embedding")
+
+        if not text.strip():
+            logger.warning("Empty text provided for embedding generation")
+            return None
+        return text
+
+    async def generate_embedding(self, text: str) -> Optional[np.ndarray]:
         """
         Generate embedding for text using OpenAI
 
@@ -32,42 +183,104 @@ class EmbeddingService:
             text: Text to generate embedding for
 
         Returns:
-            Embedding vector (1536 dimensions) or None if OpenAI is not configured
+            float32 embedding vector (1536 dimensions) or None if OpenAI is not configured
         """
-        if not self.client:
+        # Concurrent callers (e.g. documents finishing OCR together) share one request
+        return await self.batcher.embed(text)
+
+    async def generate_embeddings_batch(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Generate embeddings for several texts with a single API request
+
+        Args:
+            texts: Texts to generate embeddings for
+
+        Returns:
+            float32 embedding per input text, None where the text is empty or the request failed
+        """
+        if not self._api_key:
             logger.warning("OpenAI client not available. Cannot generate embedding.")
-            return None
+            return [None] * len(texts)
 
-        if not text or not text.strip():
-            logger.warning("Empty text provided for embedding generation")
-            return None
+        prepared = [self._prepare_text(text) for text in texts]
+        embeddings: list[Optional[np.ndarray]] = [None] * len(texts)
 
-        try:
-            # Truncate text if too long (OpenAI has token limits)
-            # text-embedding-ada-002 has a limit of 8191 tokens
-            # Approximate: 1 token ≈ 4 characters, so max ~32k characters
-            max_chars = 30000
-            if len(text) > max_chars:
-                text = text[:max_chars]
-                logger.info(f"Text truncated to {max_chars} characters for embedding")
-
-            response = self.client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
+        # Identical content (re-uploads, templated documents) is served from Redis
+        keys = {i: _embedding_cache_key(text) for i, text in enumerate(prepared) if text is not None}
+        cached = await cache_get_many(list(keys.values()))
+        for (i, _), value in zip(keys.items(), cached):
+            if value is not None:
+                embeddings[i] = np.frombuffer(value, dtype=np.float32)
 
-            embedding = response.data[0].embedding
-            logger.info(f"Generated embedding of dimension {len(embedding)}")
-            return embedding
+        missing = [i for i in keys if embeddings[i] is None]
+        if not missing:
+            return embeddings
+
+        for i, embedding in zip(missing, await self._request_embeddings([prepared[i] for i in missing])):
+            embeddings[i] = embedding
+        await cache_set_many(
+            {
+                keys[i]: embeddings[i].tobytes()
+                for i in missing
+                if embeddings[i] is not None
+            },
+            expire=EMBEDDING_CACHE_TTL_SECONDS
+        )
+        logger.info(f"Generated {sum(embeddings[i] is not None for i in missing)} of {len(missing)} embedding(s)")
+        return embeddings
+
+    async def _request_embeddings(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Send one embeddings request, halving it when the API rejects it
 
+        A 400 for a multi-input request is usually the per-request token
+        limit, so the halves are retried on their own; only inputs the API
+        rejects individually end up as None.
+        """
+        try:
+            response = await self._get_client().embeddings.create(model=EMBEDDING_MODEL, input=texts)
+        except BadRequestError as e:
+            if len(texts) == 1:
+                logger.error(f"Error generating embedding: {str(e)}")
+                return [None]
+            logger.warning(f"Embedding request for {len(texts)} inputs rejected, splitting it: {str(e)}")
+            middle = len(texts) // 2
+            return (
+                await self._request_embeddings(texts[:middle])
+                + await self._request_embeddings(texts[middle:])
+            )
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}", exc_info=True)
-            return None
+            return [None] * len(texts)
+
+        # The API returns one item per input, tagged with its input index
+        embeddings: list[Optional[np.ndarray]] = [None] * len(texts)
+        for item in response.data:
+            embeddings[item.index] = np.asarray(item.embedding, dtype=np.float32)
+        return embeddings
+
+    async def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a search query, batching concurrent calls and caching results
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Embedding vector or None if it could not be generated
+        """
+        cached = self._query_cache.get(query)
+        if cached is not None:
+            return cached
+
+        embedding = await self.batcher.embed(query)
+        if embedding is not None:
+            self._query_cache[query] = embedding
+        return embedding
 
     def is_available(self) -> bool:
         """Check if embedding service is available"""
-        return self.client is not None
+        return self._api_key is not None
 
 
 embedding_service = EmbeddingService()
-
@@ -3,20 +3,252 @@ OCR service for extracting text from documents
 """
 
 import os
+import queue
+import asyncio
+import hashlib
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+# Tesseract releases the GIL (tesserocr) or runs as a subprocess (pytesseract),
+# so threads are enough to keep several pages in flight; each run stays
+# single-threaded so they do not oversubscribe the cores. OpenMP reads this
+# when libtesseract is loaded, so it must be set before importing tesserocr.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
 import pytesseract
 import fitz  # PyMuPDF
 from PIL import Image
 from docx import Document as DocxDocument
+from lxml import etree
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
 
-from app.core.config import settings
+from app.core.cache import cache_get_sync, cache_set_sync
+from app.core.config import get_settings
 from app.models.document import FileType
 
 logger = logging.getLogger(__name__)
 
+# Celery runs OCR_WORKER_CONCURRENCY prefork processes with their own pools,
+# so by default each one gets its share of the CPUs rather than all of them
+_CPU_SHARE = max(1, (os.cpu_count() or 1) // get_settings().OCR_WORKER_CONCURRENCY)
+
+# Dedicated pool for extractions, sized by OCR_CONCURRENCY, so OCR neither
+# queues behind nor starves the default executor used for file I/O. It is
+# independent of any event loop, so it also bounds Celery's per-task loops.
+_ocr_executor = ThreadPoolExecutor(
+    max_workers=get_settings().OCR_CONCURRENCY or _CPU_SHARE,
+    thread_name_prefix="ocr"
+)
+
+# PyMuPDF is not thread-safe, even across documents, and store_shrink empties
+# a process-wide store; every MuPDF call runs under this lock so concurrent
+# extractions only overlap in Tesseract
+_mupdf_lock = threading.Lock()
+
+PAGE_WORKERS = get_settings().OCR_PAGE_WORKERS or _CPU_SHARE
+_page_executor = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix="ocr-page")
+
+# Rendered pages waiting for OCR; caps memory at a few pages however long the PDF
+MAX_PAGES_IN_FLIGHT = 2 * PAGE_WORKERS
+
+# OCR output only depends on the rendered pixels and the language
+OCR_CACHE_TTL_SECONDS = 60 * 60 * 24 * 30
+
+# Bump when extraction changes its output for the same file, so cached
+# whole-file results from the previous pipeline are not served
+OCR_PIPELINE_VERSION = 2
+
+
+class TesseractPool:
+    """
+    In-process Tesseract engines shared by all OCR threads
+
+    Engines are created on first demand, up to `size` per language, and
+    reused afterwards so their initialization is paid once per process.
+    Callers beyond `size` wait for an engine to be returned.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize the pool
+
+        Args:
+            size: Maximum number of engines per language
+        """
+        self._size = size
+        self._lock = threading.Lock()
+        self._idle: dict[str, queue.SimpleQueue] = {}
+        self._created: dict[str, int] = {}
+
+    @contextmanager
+    def borrow(self, language: str) -> Iterator["tesserocr.PyTessBaseAPI"]:
+        """Lend an engine for `language`, returning it to the pool afterwards"""
+        with self._lock:
+            idle = self._idle.setdefault(language, queue.SimpleQueue())
+            create = idle.empty() and self._created.get(language, 0) < self._size
+            if create:
+                self._created[language] = self._created.get(language, 0) + 1
+        
+        if create:
+            try:
+                api = tesserocr.PyTessBaseAPI(lang=language, psm=tesserocr.PSM.AUTO)
+            except Exception:
+                with self._lock:
+                    self._created[language] -= 1
+                raise
+        else:
+            api = idle.get()
+        
+        try:
+            yield api
+        finally:
+            # Drop the page image and recognition results while the engine is idle
+            api.Clear()
+            idle.put(api)
+
+
+_tesseract_pool = TesseractPool(PAGE_WORKERS)
+
+
+async def _run_on_ocr_executor(func, *args, **kwargs):
+    """Run a blocking extractor on the OCR pool"""
+    return await asyncio.get_running_loop().run_in_executor(_ocr_executor, partial(func, *args, **kwargs))
+
+
+def _to_greyscale(image: Image.Image) -> Image.Image:
+    """
+    Convert an image to greyscale for Tesseract
+
+    Transparent pixels are flattened onto white first; a plain convert("L")
+    drops the alpha band and leaves them black, hiding dark text.
+    """
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("L", image.size, 255)
+        background.paste(image.convert("L"), mask=image.getchannel("A"))
+        return background
+    return image.convert("L")
+
+
+def _ocr_image(image: Image.Image, language: str) -> str:
+    """Run Tesseract on an image, in-process when tesserocr is installed"""
+    if tesserocr is None:
+        return pytesseract.image_to_string(image, lang=language)
+    with _tesseract_pool.borrow(language) as api:
+        if image.mode == "L":
+            # Raw 8-bit pixels, SetImage would round-trip them through an encoded file
+            api.SetImageBytes(image.tobytes(), image.width, image.height, 1, image.width)
+        else:
+            api.SetImage(image)
+        return api.GetUTF8Text()
+
+
+# DOCX body paragraphs and the run content python-docx's Paragraph.text
+# reads (text and its inner-content elements, in document order), selected
+# in libxml2. As in python-docx, only line breaks become newlines; page and
+# column breaks produce no text.
+_W_NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+_RUN_ELEMENT_TEXT = {
+    f"{{{_W_NS['w']}}}tab": "\t",
+    f"{{{_W_NS['w']}}}ptab": "\t",
+    f"{{{_W_NS['w']}}}noBreakHyphen": "-",
+    f"{{{_W_NS['w']}}}br": "\n",
+    f"{{{_W_NS['w']}}}cr": "\n",
+}
+_RUN_CONTENT = (
+    "w:t/text() | w:tab | w:ptab | w:noBreakHyphen | w:cr"
+    " | w:br[not(@w:type) or @w:type='textWrapping']"
+)
+_DOCX_PARAGRAPHS = etree.XPath("./w:p", namespaces=_W_NS)
+_DOCX_RUN_CONTENT = etree.XPath(
+    " | ".join(
+        f"{run}/{item}"
+        for run in ("./w:r", "./w:hyperlink/w:r")
+        for item in _RUN_CONTENT.split(" | ")
+    ),
+    namespaces=_W_NS,
+)
+
+
+def _docx_paragraph_text(paragraph: etree._Element) -> str:
+    """Join a w:p element's run text, mapping inner-content elements to their text"""
+    return "".join(
+        node if isinstance(node, str) else _RUN_ELEMENT_TEXT[node.tag]
+        for node in _DOCX_RUN_CONTENT(paragraph)
+    )
+
+
+# Scanned pages are rendered at ~250 DPI, shrunk so the longest side stays
+# within MAX_RENDER_PIXELS; higher resolutions only cost memory
+OCR_RENDER_DPI = 250
+MAX_RENDER_PIXELS = 4000
+
+# With OCR_EMBEDDED_IMAGES, text pages also OCR embedded images covering at
+# least this share of the page; smaller ones are logos and decorations
+MIN_OCR_IMAGE_AREA = 0.05
+
+# Region indexes of a page's text layer and of a page-level error, sorted
+# before and after its OCR'd regions
+DIRECT_TEXT = -1
+PAGE_ERROR = 1 << 30
+
+# Text and image blocks in one pass over the page content
+_BLOCK_FLAGS = (
+    fitz.TEXT_PRESERVE_LIGATURES
+    | fitz.TEXT_PRESERVE_WHITESPACE
+    | fitz.TEXT_PRESERVE_IMAGES
+    | fitz.TEXT_MEDIABOX_CLIP
+)
+
+# Marks per-page failures and blank pages in the extracted text; such results
+# are not cached, so a silent failure is retried on the next extraction
+PAGE_ERROR_MARKER = "[Error processing page"
+NO_TEXT_PAGE_MARKER = "[No text found on page"
+
+# Whole-file results that mean nothing was extracted, also never cached
+_NO_TEXT_RESULTS = frozenset({
+    "No pages found in PDF",
+    "No text could be extracted from PDF",
+    "No text could be extracted from image",
+    "No text found in DOCX document",
+})
+
+
+def _ocr_page(image: Image.Image, language: str, cache_key: str) -> str:
+    """OCR a rendered PDF page and cache its text, off the rendering thread"""
+    ocr_text = _ocr_image(image, language).strip()
+    if ocr_text:
+        cache_set_sync(cache_key, ocr_text, expire=OCR_CACHE_TTL_SECONDS)
+    return ocr_text
+
+
+def _file_cache_key(content_sha256: str, file_type: FileType, language: str) -> str:
+    """
+    Cache key for the extracted text of a whole file
+
+    Besides the content, it covers everything that changes the output: the
+    pipeline version and whether embedded images on text pages are OCR'd.
+    """
+    embedded_images = int(get_settings().OCR_EMBEDDED_IMAGES)
+    return (
+        f"docpanel:ocr:file:v{OCR_PIPELINE_VERSION}:{content_sha256}:{file_type.value}:{language}"
+        f":img{embedded_images}"
+    )
+
+
+def _page_cache_key(samples: bytes | memoryview, language: str) -> str:
+    """Cache key for the OCR text of a rendered page"""
+    return f"docpanel:ocr:page:{hashlib.sha256(samples).hexdigest()}:{language}"
+
 
 class OCRService:
     """OCR service class for text extraction"""
@@ -53,25 +285,80 @@ class OCRService:
             if not tesseract_found:
                 logger.warning("Tesseract not found in common paths and not in system PATH. OCR may fail.")
         
+        if tesserocr is not None:
+            logger.info("Using in-process Tesseract via tesserocr")
+        
         # PyMuPDF is used for PDF processing (no external dependencies needed)
         logger.info("Using PyMuPDF for PDF processing")
 
+    def warm_up(self, language: str = "eng") -> None:
+        """Load a Tesseract engine and its language data before the first document needs it"""
+        if tesserocr is None:
+            # pytesseract starts a fresh tesseract process per call, nothing to keep warm
+            return
+        try:
+            _ocr_image(Image.new("L", (32, 32), 255), language)
+            logger.info(f"Tesseract warmed up for language: {language}")
+        except Exception as e:
+            logger.warning(f"Tesseract warm-up failed: {str(e)}")
+
     def extract_text_sync(
-        self, file_path: Path, file_type: FileType, language: str = "eng"
+        self,
+        file_path: Path,
+        file_type: FileType,
+        language: str = "eng",
+        content_sha256: Optional[str] = None,
+        use_cache: bool = True,
     ) -> str:
         """
         Extract text from document based on file type (synchronous version for thread pool)
 
+        Results are cached by file content, so identical files are only parsed once.
+        Results with failed or blank pages are not cached.
+
         Args:
             file_path: Path to the document file
             file_type: Type of the file (PDF, IMAGE, DOCX)
             language: Tesseract language code (default: eng)
+            content_sha256: Hex SHA-256 of the file when already known, saves rehashing it
+            use_cache: Read cached file and page results; False forces a fresh
+                extraction (reprocessing), whose result still refreshes the cache
 
         Returns:
             Extracted text from document
         """
+        if content_sha256 is None:
+            with open(file_path, "rb") as f:
+                content_sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+        
+        cache_key = _file_cache_key(content_sha256, file_type, language)
+        if use_cache:
+            cached_text = cache_get_sync(cache_key)
+            if cached_text is not None:
+                logger.info(f"Extracted text for {file_path} loaded from cache")
+                return cached_text.decode()
+        
+        text = self._extract_text_uncached(file_path, file_type, language, use_cache)
+        if self._is_cacheable(text):
+            cache_set_sync(cache_key, text, expire=OCR_CACHE_TTL_SECONDS)
+        return text
+
+    @staticmethod
+    def _is_cacheable(text: str) -> bool:
+        """Whether an extraction result is complete enough to reuse"""
+        return (
+            bool(text.strip())
+            and text not in _NO_TEXT_RESULTS
+            and PAGE_ERROR_MARKER not in text
+            and NO_TEXT_PAGE_MARKER not in text
+        )
+
+    def _extract_text_uncached(
+        self, file_path: Path, file_type: FileType, language: str, use_cache: bool = True
+    ) -> str:
+        """Dispatch to the extractor for `file_type`"""
         if file_type == FileType.PDF:
-            return self._extract_from_pdf_sync(file_path, language)
+            return self._extract_from_pdf_sync(file_path, language, use_cache)
         elif file_type == FileType.IMAGE:
             return self._extract_from_image_sync(file_path, language)
         elif file_type == FileType.DOCX:
@@ -80,7 +367,12 @@ class OCRService:
             raise ValueError(f"Unsupported file type for OCR: {file_type}")
 
     async def extract_text(
-        self, file_path: Path, file_type: FileType, language: str = "eng"
+        self,
+        file_path: Path,
+        file_type: FileType,
+        language: str = "eng",
+        content_sha256: Optional[str] = None,
+        use_cache: bool = True,
     ) -> str:
         """
         Extract text from document based on file type (async wrapper)
@@ -89,61 +381,67 @@ class OCRService:
             file_path: Path to the document file
             file_type: Type of the file (PDF, IMAGE, DOCX)
             language: Tesseract language code (default: eng)
+            content_sha256: Hex SHA-256 of the file when already known
+            use_cache: Read cached results; False forces a fresh extraction
 
         Returns:
             Extracted text from document
         """
-        import asyncio
-        return await asyncio.to_thread(
+        return await _run_on_ocr_executor(
             self.extract_text_sync,
             file_path=file_path,
             file_type=file_type,
-            language=language
+            language=language,
+            content_sha256=content_sha256,
+            use_cache=use_cache
         )
 
-    def _extract_from_pdf_sync(self, file_path: Path, language: str) -> str:
+    def _extract_from_pdf_sync(self, file_path: Path, language: str, use_cache: bool = True) -> str:
         """Extract text from PDF file (synchronous) using PyMuPDF"""
         try:
             logger.info(f"Extracting text from PDF: {file_path}")
             
             # Open PDF with PyMuPDF
-            doc = fitz.open(str(file_path))
-            total_pages = len(doc)
+            with _mupdf_lock:
+                doc = fitz.open(str(file_path))
+                total_pages = len(doc)
             logger.info(f"PDF opened, total pages: {total_pages}")
             
+            # Text per page and region: the text layer, OCR'd regions, or error placeholders
+            page_parts: list[dict[int, str]] = [{} for _ in range(total_pages)]
+            in_flight: dict[Future, tuple[int, int]] = {}
+            ocr_regions = 0
+            
+            try:
+                # Scanned pages are OCR'd in parallel while rendering continues;
+                # once enough regions are queued, rendering waits for any of them
+                for page_num, region, cache_key, image in self._iter_ocr_regions(doc, page_parts, language, use_cache):
+                    in_flight[_page_executor.submit(_ocr_page, image, language, cache_key)] = (page_num, region)
+                    ocr_regions += 1
+                    if len(in_flight) >= MAX_PAGES_IN_FLIGHT:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for job in done:
+                            self._collect_ocr_region(*in_flight.pop(job), job, page_parts)
+            except BaseException:
+                for job in in_flight:
+                    job.cancel()
+                raise
+            finally:
+                with _mupdf_lock:
+                    doc.close()
+            
             if total_pages == 0:
-                doc.close()
                 return "No pages found in PDF"
             
-            extracted_texts = []
-            
-            # First, try to extract text directly (for text-based PDFs)
-            for page_num in range(total_pages):
-                try:
-                    page = doc[page_num]
-                    text = page.get_text()
-                    
-                    if text.strip():
-                        # Text found directly, use it
-                        extracted_texts.append(text.strip())
-                        logger.info(f"Page {page_num + 1}/{total_pages}: Extracted {len(text)} characters (direct text)")
-                    else:
-                        # No text found, this might be a scanned PDF, use OCR
-                        logger.info(f"Page {page_num + 1}/{total_pages}: No direct text, using OCR")
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better OCR
-                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        ocr_text = pytesseract.image_to_string(img, lang=language)
-                        extracted_texts.append(ocr_text.strip() if ocr_text.strip() else f"[No text found on page {page_num + 1}]")
-                        logger.info(f"Page {page_num + 1}/{total_pages}: OCR completed")
-                        
-                except Exception as page_error:
-                    error_msg = f"Error processing page {page_num + 1}: {str(page_error)}"
-                    logger.error(error_msg)
-                    extracted_texts.append(f"[{error_msg}]")
+            for job, (page_num, region) in in_flight.items():
+                self._collect_ocr_region(page_num, region, job, page_parts)
             
-            doc.close()
+            # Per-page progress is logged at DEBUG, one summary line per document
+            logger.info(f"Processed {total_pages} pages of {file_path}: {ocr_regions} regions OCR'd")
             
-            result = "\n\n".join(extracted_texts)
+            result = "\n\n".join(
+                self._page_text(page_num, parts) for page_num, parts in enumerate(page_parts)
+            )
             return result if result.strip() else "No text could be extracted from PDF"
             
         except Exception as e:
@@ -151,12 +449,151 @@ class OCRService:
             logger.error(error_msg, exc_info=True)
             raise ValueError(error_msg)
 
+    def _iter_ocr_regions(
+        self, doc: fitz.Document, page_parts: list[dict[int, str]], language: str, use_cache: bool = True
+    ) -> Iterator[tuple[int, int, str, Image.Image]]:
+        """
+        Fill in each page's text layer and yield the regions that still need OCR
+
+        Pages are loaded by number rather than through doc.pages(), so each
+        one is loaded and rendered under _mupdf_lock and released before the
+        next; cache lookups and the yielded Tesseract work happen outside it.
+
+        Args:
+            doc: Open PDF document
+            page_parts: Per-page text by region, filled in with text layers, cache hits and errors
+            language: Tesseract language code
+            use_cache: Reuse OCR text cached for identical renders
+
+        Yields:
+            Tuples of (page_num, region, cache_key, image) for regions that still need OCR
+        """
+        total_pages = len(doc)
+        ocr_embedded_images = get_settings().OCR_EMBEDDED_IMAGES
+        for page_num in range(total_pages):
+            parts = page_parts[page_num]
+            try:
+                with _mupdf_lock:
+                    renders = self._render_ocr_regions(doc, page_num, parts, language, ocr_embedded_images)
+            except Exception as page_error:
+                parts[PAGE_ERROR] = self._page_error(page_num, page_error)
+                continue
+            
+            for region, cache_key, image in renders:
+                cached_text = cache_get_sync(cache_key) if use_cache else None
+                if cached_text is not None:
+                    parts[region] = cached_text.decode()
+                    logger.debug(f"Page {page_num + 1}/{total_pages}: OCR text loaded from cache")
+                    continue
+                yield page_num, region, cache_key, image
+
+    def _render_ocr_regions(
+        self,
+        doc: fitz.Document,
+        page_num: int,
+        parts: dict[int, str],
+        language: str,
+        ocr_embedded_images: bool,
+    ) -> list[tuple[int, str, Image.Image]]:
+        """
+        Store a page's text layer in `parts` and render the regions that need OCR
+
+        Pages without text are rendered whole. Pages with text keep their text
+        layer; with OCR_EMBEDDED_IMAGES on, each sizeable embedded image is
+        also rendered on its own, with any text blocks over it blanked out so
+        that text is not read twice.
+
+        Each pixmap is dropped as soon as it is copied into an image and
+        MuPDF's store is emptied after every render, so peak memory does not
+        grow with the page count. Must be called with _mupdf_lock held.
+
+        Returns:
+            Tuples of (region, cache_key, image) for the page
+        """
+        total_pages = len(doc)
+        page = doc.load_page(page_num)
+        
+        # A page without font resources cannot have a text layer (scans),
+        # so skip interpreting its content stream and go straight to OCR
+        blocks = page.get_text("blocks", flags=_BLOCK_FLAGS) if page.get_fonts() else []
+        text_blocks = [block for block in blocks if block[6] == 0 and block[4].strip()]
+        text = "".join(block[4] for block in text_blocks).strip()
+        
+        if not text:
+            # No text found, this might be a scanned PDF, use OCR
+            logger.debug(f"Page {page_num + 1}/{total_pages}: No direct text, using OCR")
+            clips = [page.rect]
+        else:
+            # Text found directly, use it
+            parts[DIRECT_TEXT] = text
+            logger.debug(f"Page {page_num + 1}/{total_pages}: Extracted {len(text)} characters (direct text)")
+            if not ocr_embedded_images:
+                return []
+            clips = self._embedded_image_rects(page, blocks)
+        
+        # Tesseract binarizes internally, so render straight to greyscale
+        zoom = min(OCR_RENDER_DPI / 72, MAX_RENDER_PIXELS / max(page.rect.width, page.rect.height))
+        matrix = fitz.Matrix(zoom, zoom)
+        renders = []
+        for region, clip in enumerate(clips):
+            pix = page.get_pixmap(matrix=matrix, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+            for block in text_blocks:
+                overlap = fitz.Rect(block[:4]) & clip
+                if not overlap.is_empty:
+                    pix.set_rect((overlap * matrix).irect, (255,))
+            
+            # samples_mv views MuPDF's buffer, pix.samples would copy it first
+            samples = pix.samples_mv
+            cache_key = _page_cache_key(samples, language)
+            image = Image.frombytes("L", [pix.width, pix.height], samples)
+            samples = pix = None
+            fitz.TOOLS.store_shrink(100)
+            renders.append((region, cache_key, image))
+        return renders
+
+    @staticmethod
+    def _embedded_image_rects(page: fitz.Page, blocks: list[tuple]) -> list[fitz.Rect]:
+        """Rectangles of the page's image blocks large enough to hold scanned text"""
+        min_area = MIN_OCR_IMAGE_AREA * page.rect.get_area()
+        rects = []
+        for block in blocks:
+            rect = fitz.Rect(block[:4]) & page.rect
+            if block[6] == 1 and rect.get_area() >= min_area:
+                rects.append(rect)
+        return rects
+
+    def _collect_ocr_region(
+        self, page_num: int, region: int, job: Future, page_parts: list[dict[int, str]]
+    ) -> None:
+        """Wait for a region's OCR and store its text in `page_parts`"""
+        try:
+            page_parts[page_num][region] = job.result()
+            logger.debug(f"Page {page_num + 1}/{len(page_parts)}: OCR completed")
+        except Exception as page_error:
+            page_parts[page_num][region] = self._page_error(page_num, page_error)
+
+    @staticmethod
+    def _page_text(page_num: int, parts: dict[int, str]) -> str:
+        """Join a page's text layer and OCR'd regions, or return a placeholder when all are blank"""
+        text = "\n\n".join(parts[region] for region in sorted(parts) if parts[region])
+        return text if text else f"[No text found on page {page_num + 1}]"
+
+    @staticmethod
+    def _page_error(page_num: int, error: Exception) -> str:
+        """Log a failed page and return its placeholder text"""
+        error_msg = f"Error processing page {page_num + 1}: {str(error)}"
+        logger.error(error_msg)
+        return f"[{error_msg}]"
+
     def _extract_from_image_sync(self, file_path: Path, language: str) -> str:
         """Extract text from image file (synchronous)"""
         try:
             logger.info(f"Extracting text from image: {file_path}")
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image, lang=language)
+            with Image.open(file_path) as image:
+                # JPEGs are decoded straight to greyscale by libjpeg; no-op for other formats
+                image.draft("L", image.size)
+                image = _to_greyscale(image)
+            text = _ocr_image(image, language)
             result = text.strip()
             logger.info(f"Extracted {len(result)} characters from image")
             return result if result else "No text could be extracted from image"
@@ -170,7 +607,8 @@ class OCRService:
         try:
             logger.info(f"Extracting text from DOCX: {file_path}")
             doc = DocxDocument(str(file_path))
-            paragraphs = [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
+            texts = (_docx_paragraph_text(p) for p in _DOCX_PARAGRAPHS(doc.element.body))
+            paragraphs = [text for text in texts if text.strip()]
             result = "\n\n".join(paragraphs)
             logger.info(f"Extracted {len(result)} characters from DOCX")
             return result if result.strip() else "No text found in DOCX document"
@@ -182,18 +620,15 @@ class OCRService:
     # Keep async versions for backward compatibility
     async def _extract_from_pdf(self, file_path: Path, language: str) -> str:
         """Extract text from PDF file (async wrapper)"""
-        import asyncio
-        return await asyncio.to_thread(self._extract_from_pdf_sync, file_path, language)
+        return await _run_on_ocr_executor(self._extract_from_pdf_sync, file_path, language)
 
     async def _extract_from_image(self, file_path: Path, language: str) -> str:
         """Extract text from image file (async wrapper)"""
-        import asyncio
-        return await asyncio.to_thread(self._extract_from_image_sync, file_path, language)
+        return await _run_on_ocr_executor(self._extract_from_image_sync, file_path, language)
 
     async def _extract_from_docx(self, file_path: Path) -> str:
         """Extract text from DOCX file (async wrapper)"""
-        import asyncio
-        return await asyncio.to_thread(self._extract_from_docx_sync, file_path)
+        return await _run_on_ocr_executor(self._extract_from_docx_sync, file_path)
 
 
 ocr_service = OCRService()
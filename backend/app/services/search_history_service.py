@@ -0,0 +1,91 @@
+"""
+Buffered writer for semantic search history
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from asyncpg.exceptions import DataError, IntegrityConstraintViolationError
+from sqlalchemy import exc as sa_exc
+
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ["user_id", "query", "results_count", "created_at"]
+
+# Errors caused by the rows themselves; retrying the batch would fail again
+_BAD_BATCH_ERRORS = (DataError, IntegrityConstraintViolationError, sa_exc.DataError, sa_exc.IntegrityError)
+
+
+class SearchHistoryBuffer:
+    """
+    Collects search history rows in memory and writes them with COPY
+
+    Rows are flushed every `flush_interval` seconds, or sooner once
+    `max_batch_size` rows are waiting. Rows from a write that failed on the
+    connection are kept for the next flush, up to `max_buffered` rows; older
+    ones are dropped past that. A batch the database rejects for its content
+    (bad data, a deleted user) is logged and dropped. Rows still buffered
+    when the process dies are lost, which is acceptable for history data.
+    """
+
+    def __init__(self, max_batch_size: int = 100, flush_interval: float = 1.0, max_buffered: int = 10000):
+        self._max_batch_size = max_batch_size
+        self._max_buffered = max_buffered
+        self._flush_interval = flush_interval
+        self._records: list[tuple] = []
+        self._batch_ready = asyncio.Event()
+
+    def put_nowait(self, user_id: int, query: str, results_count: int) -> None:
+        """Buffer one search for the next flush"""
+        # Postgres text cannot hold NUL, which would fail the whole COPY
+        query = query.replace("\x00", "")
+        self._records.append((user_id, query, results_count, datetime.now(timezone.utc)))
+        if len(self._records) >= self._max_batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> None:
+        """Write all buffered rows in a single COPY"""
+        records, self._records = self._records, []
+        self._batch_ready.clear()
+        if not records:
+            return
+
+        try:
+            async with engine.connect() as conn:
+                raw_connection = await conn.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    "document_search_history",
+                    records=records,
+                    columns=_COLUMNS,
+                )
+        except _BAD_BATCH_ERRORS as e:
+            logger.error(f"Dropped {len(records)} search history rows rejected by the database: {str(e)}")
+        except BaseException:
+            # Keep the rows for the next flush, oldest dropped first past the bound
+            self._records = (records + self._records)[-self._max_buffered:]
+            raise
+
+    async def run(self) -> None:
+        """Flush periodically until cancelled, then flush what is left"""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Failed to write search history: {str(e)}", exc_info=True)
+        except asyncio.CancelledError:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write search history on shutdown: {str(e)}", exc_info=True)
+            raise
+
+
+search_history_buffer = SearchHistoryBuffer()
@@ -0,0 +1,28 @@
+"""
+Celery application for off-process background jobs
+"""
+
+from celery import Celery
+from app.core.config import get_settings
+
+settings = get_settings()
+
+celery_app = Celery(
+    "docpanel",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.workers.tasks"],
+)
+
+celery_app.conf.update(
+    task_default_queue="default",
+    task_routes={
+        "app.workers.tasks.process_ocr": {"queue": "ocr"},
+    },
+    task_acks_late=True,
+    # OCR jobs are long and CPU-bound, don't let a worker hoard them
+    worker_prefetch_multiplier=1,
+    # Each process sizes its OCR thread pools from this, see ocr_service
+    worker_concurrency=settings.OCR_WORKER_CONCURRENCY,
+    task_ignore_result=True,
+)
@@ -0,0 +1,46 @@
+"""
+Celery tasks
+"""
+
+import asyncio
+import logging
+
+from celery.signals import worker_process_init
+
+from app.core.cache import close_redis
+from app.core.database import AsyncSessionLocal, engine
+from app.services.document_service import DocumentService
+from app.services.ocr_service import ocr_service
+from app.workers.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@worker_process_init.connect
+def _warm_up_ocr(**kwargs) -> None:
+    """Load Tesseract in each worker process before it takes its first task"""
+    ocr_service.warm_up()
+
+
+async def _process_ocr(document_id: int, use_cache: bool) -> None:
+    """Run the async OCR pipeline inside a fresh event loop"""
+    try:
+        async with AsyncSessionLocal() as session:
+            await DocumentService(session).process_ocr(document_id, use_cache=use_cache)
+    finally:
+        # Pooled connections are bound to this task's event loop
+        await engine.dispose()
+        await close_redis()
+
+
+@celery_app.task(queue="ocr", acks_late=True)
+def process_ocr(document_id: int, use_cache: bool = True) -> None:
+    """
+    Extract text and embedding for a document
+    
+    Args:
+        document_id: Document ID to process
+        use_cache: Reuse cached OCR results; False forces a fresh extraction
+    """
+    logger.info(f"OCR task received for document ID: {document_id}")
+    asyncio.run(_process_ocr(document_id, use_cache))
@@ -4,20 +4,21 @@
 -- Önce extension'ın yüklü olduğundan emin ol
 CREATE EXTENSION IF NOT EXISTS vector;
 
--- Embedding column'ı vector tipine çevir
+-- Embedding column'ı halfvec tipine çevir (fp16, pgvector >= 0.7)
 -- Embedding'ler array formatında saklanmış: [-0.007523200009018183, ...]
 ALTER TABLE documents 
-ALTER COLUMN embedding TYPE vector(1536) 
+ALTER COLUMN embedding TYPE halfvec(1536) 
 USING CASE 
     WHEN embedding IS NULL THEN NULL
     WHEN embedding = '' THEN NULL
-    ELSE embedding::vector
+    ELSE embedding::halfvec(1536)
 END;
 
 -- Index ekle (performans için)
-CREATE INDEX IF NOT EXISTS documents_embedding_idx ON documents 
-USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+DROP INDEX IF EXISTS documents_embedding_idx;
+CREATE INDEX IF NOT EXISTS documents_embedding_hnsw ON documents 
+USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
 
 -- Kontrol et
 SELECT column_name, data_type 
@@ -3,11 +3,18 @@ Intelligent Document Management System - FastAPI Backend
 Main application entry point
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.v1 import auth, documents
+from app.core.cache import close_redis, ping_redis
+from app.core.database import check_database, warm_up_pool
+from app.services.search_history_service import search_history_buffer
 
 # Configure logging
 logging.basicConfig(
@@ -16,10 +23,25 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    await warm_up_pool()
+    search_history_task = asyncio.create_task(search_history_buffer.run())
+    yield
+    search_history_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await search_history_task
+    await close_redis()
+
+
 app = FastAPI(
     title="Intelligent Document Management System",
     description="AI-powered document management platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -31,6 +53,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (document lists, search results)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(documents.router, prefix="/api/v1")
@@ -51,6 +76,10 @@ async def health_live():
 @app.get("/health/ready")
 async def health_ready():
     """Readiness probe"""
-    # TODO: Check database, Redis, OCR service
-    return {"status": "ready"}
+    # OCR runs in the Celery worker, which warms Tesseract up on start
+    database_ok, redis_ok = await asyncio.gather(check_database(), ping_redis())
+    checks = {"database": database_ok, "redis": redis_ok}
+    if not all(checks.values()):
+        return ORJSONResponse(status_code=503, content={"status": "not ready", "checks": checks})
+    return {"status": "ready", "checks": checks}
 
@@ -0,0 +1,145 @@
+"""
+Redis-backed semantic search and document body caches
+"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy as np
+
+from app.api.v1 import documents as documents_api
+from app.services import document_service as document_module
+from app.services.document_service import DocumentService, invalidate_search_cache
+
+
+class FakeRedis:
+    """In-memory stand-ins for the cache helpers"""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, expire):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    async def incr(self, key):
+        value = int(self.values.get(key, b"0")) + 1
+        self.values[key] = str(value).encode()
+        return value
+
+
+class FakeDocument:
+    def __init__(self, document_id: int):
+        self.id = document_id
+
+
+class SearchCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.repository = mock.Mock()
+        self.repository.semantic_search = mock.AsyncMock(
+            return_value=[(FakeDocument(3), 0.9), (FakeDocument(1), 0.8)]
+        )
+        self.repository.get_many_for_user = mock.AsyncMock(
+            side_effect=lambda ids, user_id: [FakeDocument(document_id) for document_id in ids if document_id != 1]
+        )
+        self.history = mock.Mock()
+        embedding = mock.Mock(is_available=lambda: True, embed_query=mock.AsyncMock(return_value=np.zeros(3)))
+
+        patches = [
+            mock.patch.object(document_module, "cache_get", self.redis.get),
+            mock.patch.object(document_module, "cache_set", self.redis.set),
+            mock.patch.object(document_module, "cache_incr", self.redis.incr),
+            mock.patch.object(document_module, "embedding_service", embedding),
+            mock.patch.object(document_module, "search_history_buffer", self.history),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.service = DocumentService.__new__(DocumentService)
+        self.service.repository = self.repository
+
+    async def test_hit_reloads_rows_by_id_in_ranked_order(self):
+        await self.service.semantic_search(7, "Annual  report")
+        results = await self.service.semantic_search(7, "annual report")
+
+        self.assertEqual(self.repository.semantic_search.await_count, 1)
+        self.repository.get_many_for_user.assert_awaited_once_with([3, 1], 7)
+        # Document 1 was deleted since the search was cached
+        self.assertEqual([(document.id, similarity) for document, similarity in results], [(3, 0.9)])
+
+    async def test_hits_and_misses_are_both_recorded_in_history(self):
+        await self.service.semantic_search(7, "report")
+        await self.service.semantic_search(7, "report")
+
+        self.assertEqual(
+            self.history.put_nowait.call_args_list, [mock.call(7, "report", 2), mock.call(7, "report", 1)]
+        )
+
+    async def test_invalidation_retires_only_that_users_results(self):
+        await self.service.semantic_search(7, "report")
+        await self.service.semantic_search(8, "report")
+        await invalidate_search_cache(7)
+        await self.service.semantic_search(7, "report")
+        await self.service.semantic_search(8, "report")
+
+        searched_users = [call.kwargs["user_id"] for call in self.repository.semantic_search.await_args_list]
+        self.assertEqual(searched_users, [7, 8, 7])
+
+
+class DocumentBodyCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.repository = mock.Mock()
+        self.repository.get_version_for_user = mock.AsyncMock(
+            side_effect=lambda document_id, user_id: mock.Mock(updated_at=self.updated_at)
+        )
+        self.repository.get_by_id_for_user = mock.AsyncMock(
+            side_effect=lambda document_id, user_id: mock.Mock(id=document_id, updated_at=self.updated_at)
+        )
+        response = mock.Mock()
+        response.model_validate.side_effect = lambda document: mock.Mock(
+            model_dump_json=lambda: f'{{"updated_at": "{document.updated_at.isoformat()}"}}'
+        )
+
+        patches = [
+            mock.patch.object(documents_api, "cache_get", self.redis.get),
+            mock.patch.object(documents_api, "cache_set", self.redis.set),
+            mock.patch.object(documents_api, "DocumentService", lambda db: mock.Mock(repository=self.repository)),
+            mock.patch.object(documents_api, "DocumentResponse", response),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.user = mock.Mock(id=2)
+
+    async def test_miss_costs_one_query(self):
+        await documents_api.get_document(1, None, self.user)
+
+        self.repository.get_by_id_for_user.assert_awaited_once()
+        self.repository.get_version_for_user.assert_not_awaited()
+
+    async def test_hit_is_served_after_the_version_probe(self):
+        first = await documents_api.get_document(1, None, self.user)
+        second = await documents_api.get_document(1, None, self.user)
+
+        self.assertEqual(second.body, first.body)
+        self.assertEqual(self.repository.get_by_id_for_user.await_count, 1)
+        self.repository.get_version_for_user.assert_awaited_once()
+
+    async def test_changed_document_is_reloaded(self):
+        await documents_api.get_document(1, None, self.user)
+        self.updated_at = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        response = await documents_api.get_document(1, None, self.user)
+
+        self.assertIn(b"2026-02-01", response.body)
+        self.assertEqual(self.repository.get_by_id_for_user.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
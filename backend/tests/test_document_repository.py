@@ -0,0 +1,51 @@
+"""
+List search matching semantics of DocumentRepository._apply_filters
+
+The baseline matched `search` as a substring of title, filename and
+extracted_text with ILIKE. Since the trigram/full-text indexes:
+- title and filename still match substrings, for searches of 3+ characters
+- extracted_text (and title/filename) match whole words through search_tsv
+- searches under 3 characters only match whole words through search_tsv
+"""
+
+import unittest
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.document import Document
+from app.repositories.document_repository import DocumentRepository
+
+
+def _where_clause(search: str) -> str:
+    """Compile the filtered query and return its WHERE clause with parameters inlined"""
+    query = DocumentRepository(session=None)._apply_filters(select(Document.id), user_id=1, search=search)
+    compiled = query.compile(dialect=postgresql.dialect())
+    where = str(compiled).split("WHERE", 1)[1]
+    for name, value in compiled.params.items():
+        where = where.replace(f"%({name})s", repr(value))
+    return where
+
+
+class DocumentSearchFilterTest(unittest.TestCase):
+    def test_long_search_matches_title_and_filename_substrings_or_words(self):
+        where = _where_clause("invoice")
+
+        self.assertIn("documents.title ILIKE '%invoice%'", where)
+        self.assertIn("documents.filename ILIKE '%invoice%'", where)
+        self.assertIn("documents.search_tsv @@ plainto_tsquery('simple', 'invoice')", where)
+
+    def test_extracted_text_is_matched_by_whole_words_only(self):
+        where = _where_clause("invoice")
+
+        self.assertNotIn("extracted_text", where)
+
+    def test_short_search_matches_whole_words_only(self):
+        where = _where_clause("ab")
+
+        self.assertNotIn("ILIKE", where)
+        self.assertIn("documents.search_tsv @@ plainto_tsquery('simple', 'ab')", where)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+EmbeddingBatcher token bounding and splitting of rejected requests
+"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import httpx
+import numpy as np
+from openai import BadRequestError
+
+from app.services import embedding_service as embedding_module
+from app.services.embedding_service import EmbeddingBatcher, EmbeddingService
+
+
+def _bad_request() -> BadRequestError:
+    response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/embeddings"))
+    return BadRequestError("maximum context length exceeded", response=response, body=None)
+
+
+class FakeEmbeddings:
+    """embeddings.create that records request sizes and rejects oversized ones"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.requests: list[list[str]] = []
+
+    async def create(self, model, input):
+        self.requests.append(input)
+        if sum(len(text) for text in input) > self.max_chars or any(text.startswith("bad") for text in input):
+            raise _bad_request()
+        data = [mock.Mock(index=index, embedding=[float(len(text))]) for index, text in enumerate(input)]
+        return mock.Mock(data=data)
+
+
+async def _no_cached_values(keys):
+    return [None] * len(keys)
+
+
+async def _ignore_writes(values, expire):
+    pass
+
+
+class EmbeddingServiceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(embedding_module, "cache_get_many", _no_cached_values),
+            mock.patch.object(embedding_module, "cache_set_many", _ignore_writes),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.embeddings = FakeEmbeddings(max_chars=50000)
+        self.service = EmbeddingService()
+        self.service._api_key = "test"
+        self.service._get_client = lambda: mock.Mock(embeddings=self.embeddings)
+
+    async def test_rejected_request_is_split_and_retried(self):
+        texts = ["a" * 20000] * 4 + ["bad input"]
+
+        embeddings = await self.service.generate_embeddings_batch(texts)
+
+        self.assertEqual([embedding is not None for embedding in embeddings], [True] * 4 + [False])
+        np.testing.assert_array_equal(embeddings[0], np.array([20000.0], dtype=np.float32))
+        # Every request after the first is a half of a rejected one
+        self.assertEqual(len(self.embeddings.requests[0]), 5)
+        self.assertTrue(all(len(request) < 5 for request in self.embeddings.requests[1:]))
+
+    async def test_other_errors_fail_the_batch_without_retrying(self):
+        self.embeddings.create = mock.AsyncMock(side_effect=RuntimeError("network"))
+
+        embeddings = await self.service.generate_embeddings_batch(["one", "two"])
+
+        self.assertEqual(embeddings, [None, None])
+        self.assertEqual(self.embeddings.create.await_count, 1)
+
+    async def test_batcher_closes_batches_at_the_token_budget(self):
+        # 20000 characters estimate to 5001 tokens; two fit in 12000, three do not
+        self.service.batcher = EmbeddingBatcher(self.service, max_batch_tokens=12000)
+
+        embeddings = await asyncio.gather(*(self.service.generate_embedding("b" * 20000) for _ in range(5)))
+
+        self.assertTrue(all(embedding is not None for embedding in embeddings))
+        self.assertEqual([len(request) for request in self.embeddings.requests], [2, 2, 1])
+
+    async def test_batcher_still_caps_batches_by_count(self):
+        self.service.batcher = EmbeddingBatcher(self.service, max_batch_size=3)
+
+        await asyncio.gather(*(self.service.generate_embedding(f"query {index}") for index in range(7)))
+
+        self.assertEqual([len(request) for request in self.embeddings.requests], [3, 3, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
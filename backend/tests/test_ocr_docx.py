@@ -0,0 +1,76 @@
+"""
+DOCX extraction must match python-docx's Paragraph.text
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from docx import Document as DocxDocument
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from app.services.ocr_service import ocr_service
+
+
+def _build_fixture(path: Path) -> None:
+    """Write a DOCX covering every run inner-content element python-docx maps to text"""
+    doc = DocxDocument()
+    doc.add_paragraph("Plain\ttab")
+    doc.add_paragraph("   ")
+
+    paragraph = doc.add_paragraph("line")
+    paragraph.add_run("break").add_break(WD_BREAK.LINE)
+    paragraph.add_run("page").add_break(WD_BREAK.PAGE)
+    paragraph.add_run("column").add_break(WD_BREAK.COLUMN)
+    paragraph.add_run("end")
+
+    paragraph = doc.add_paragraph("inner")
+    run = paragraph.add_run("content")
+    for tag in ("w:cr", "w:noBreakHyphen", "w:ptab"):
+        run._r.append(OxmlElement(tag))
+    run._r.append(OxmlElement("w:t"))
+
+    paragraph = doc.add_paragraph("see ")
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("w:anchor"), "target")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = "the link"
+    link_run.append(link_text)
+    link_run.append(OxmlElement("w:br"))
+    hyperlink.append(link_run)
+    paragraph._p.append(hyperlink)
+
+    # Only body paragraphs are extracted, as with Document.paragraphs
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "in a table"
+    doc.add_page_break()
+    doc.add_paragraph("last page")
+    doc.save(str(path))
+
+
+class DocxExtractionTest(unittest.TestCase):
+    def test_matches_python_docx(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fixture.docx"
+            _build_fixture(path)
+
+            expected = "\n\n".join(
+                paragraph.text
+                for paragraph in DocxDocument(str(path)).paragraphs
+                if paragraph.text.strip()
+            )
+            self.assertEqual(ocr_service._extract_from_docx_sync(path), expected)
+
+    def test_page_and_column_breaks_produce_no_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fixture.docx"
+            _build_fixture(path)
+
+            text = ocr_service._extract_from_docx_sync(path)
+            self.assertIn("linebreak\npagecolumnend", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Image extraction must flatten transparency onto white before OCR
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+from app.services.ocr_service import ocr_service
+
+
+def _ocr_input(path: Path) -> Image.Image:
+    """Run image extraction and return the image handed to Tesseract"""
+    with mock.patch("app.services.ocr_service._ocr_image", return_value="text") as ocr_image:
+        ocr_service._extract_from_image_sync(path, "eng")
+    return ocr_image.call_args.args[0]
+
+
+class ImageExtractionTest(unittest.TestCase):
+    def test_transparent_png_is_flattened_onto_white(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "transparent.png"
+            image = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+            ImageDraw.Draw(image).rectangle((20, 20, 60, 60), fill=(0, 0, 0, 255))
+            image.save(path)
+
+            greyscale = _ocr_input(path)
+            self.assertEqual(greyscale.mode, "L")
+            self.assertEqual(greyscale.getpixel((150, 80)), 255)
+            self.assertEqual(greyscale.getpixel((40, 40)), 0)
+
+    def test_palette_png_with_transparency_is_flattened_onto_white(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "palette.png"
+            image = Image.new("P", (100, 100), 0)
+            image.putpalette([0, 0, 0] * 256)
+            ImageDraw.Draw(image).rectangle((10, 10, 30, 30), fill=1)
+            image.info["transparency"] = 0
+            image.save(path, transparency=0)
+
+            greyscale = _ocr_input(path)
+            self.assertEqual(greyscale.getpixel((80, 80)), 255)
+            self.assertEqual(greyscale.getpixel((20, 20)), 0)
+
+    def test_opaque_image_is_converted_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "opaque.png"
+            Image.new("RGB", (50, 50), (0, 0, 0)).save(path)
+
+            self.assertEqual(_ocr_input(path).getextrema(), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+PDF extraction: text layers, OCR of scanned pages, page caching and cleanup
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import fitz
+
+from app.services import ocr_service as ocr_module
+from app.services.ocr_service import ocr_service
+
+
+def _scan_pixmap() -> fitz.Pixmap:
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 300, 300), False)
+    pixmap.clear_with(255)
+    pixmap.set_rect(fitz.IRect(50, 50, 250, 120), (0,))
+    return pixmap
+
+
+def _build_pdf(path: Path) -> None:
+    """Text page, scanned page, then a text page with a large embedded scan"""
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Typed page one")
+    scanned = doc.new_page()
+    scanned.insert_image(scanned.rect, pixmap=_scan_pixmap())
+    mixed = doc.new_page()
+    mixed.insert_text((72, 72), "Caption above figure")
+    mixed.insert_image(fitz.Rect(72, 100, 500, 600), pixmap=_scan_pixmap())
+    doc.save(str(path))
+    doc.close()
+
+
+class PdfExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.cache: dict[str, bytes] = {}
+        self.ocr_image = mock.Mock(side_effect=lambda image, language: f"ocr {image.size[0]}x{image.size[1]}")
+        patches = [
+            mock.patch.object(ocr_module, "_ocr_image", self.ocr_image),
+            mock.patch.object(ocr_module, "cache_get_sync", self.cache.get),
+            mock.patch.object(
+                ocr_module, "cache_set_sync", lambda key, value, expire: self.cache.__setitem__(key, value.encode())
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "mixed.pdf"
+        _build_pdf(self.path)
+
+    def _extract(self, use_cache: bool = True, embedded_images: bool = False) -> list[str]:
+        settings = mock.Mock(OCR_EMBEDDED_IMAGES=embedded_images)
+        with mock.patch.object(ocr_module, "get_settings", return_value=settings):
+            return ocr_service._extract_from_pdf_sync(self.path, "eng", use_cache).split("\n\n")
+
+    def test_text_layers_are_kept_and_scanned_pages_ocrd_in_order(self):
+        pages = self._extract()
+
+        self.assertEqual(pages[0], "Typed page one")
+        self.assertTrue(pages[1].startswith("ocr "))
+        self.assertEqual(pages[2], "Caption above figure")
+        self.assertEqual(self.ocr_image.call_count, 1)
+
+    def test_embedded_images_are_ocrd_only_when_enabled(self):
+        pages = self._extract(embedded_images=True)
+
+        self.assertEqual(pages[2], "Caption above figure")
+        self.assertTrue(pages[3].startswith("ocr "))
+        self.assertEqual(self.ocr_image.call_count, 2)
+
+    def test_page_cache_skips_ocr_unless_bypassed(self):
+        first = self._extract()
+        self.assertEqual(self._extract(), first)
+        self.assertEqual(self.ocr_image.call_count, 1)
+
+        self._extract(use_cache=False)
+        self.assertEqual(self.ocr_image.call_count, 2)
+
+    def test_failed_ocr_leaves_a_placeholder_for_that_page_only(self):
+        self.ocr_image.side_effect = RuntimeError("engine crashed")
+
+        pages = self._extract()
+
+        self.assertEqual(pages[0], "Typed page one")
+        self.assertEqual(pages[1], "[Error processing page 2: engine crashed]")
+        self.assertEqual(self.cache, {})
+
+    def test_document_is_closed_when_extraction_is_interrupted(self):
+        opened = []
+        real_open = fitz.open
+
+        def tracking_open(*args, **kwargs):
+            opened.append(real_open(*args, **kwargs))
+            return opened[-1]
+
+        with mock.patch.object(ocr_module.fitz, "open", tracking_open), mock.patch.object(
+            ocr_module.OCRService, "_render_ocr_regions", side_effect=KeyboardInterrupt
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self._extract()
+
+        self.assertTrue(opened[0].is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
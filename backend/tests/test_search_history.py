@@ -0,0 +1,106 @@
+"""
+Search history buffer failure handling
+"""
+
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from unittest import mock
+
+from asyncpg.exceptions import ForeignKeyViolationError
+
+from app.services import search_history_service
+from app.services.search_history_service import SearchHistoryBuffer
+
+
+class FakeEngine:
+    """Engine whose raw connection records COPYs, failing with queued errors first"""
+
+    def __init__(self, *errors: BaseException):
+        self.errors = list(errors)
+        self.copied: list[list[tuple]] = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def get_raw_connection(self):
+        return mock.Mock(driver_connection=self)
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.copied.append(records)
+
+
+def _queries(records: list[tuple]) -> list[str]:
+    return [record[1] for record in records]
+
+
+class SearchHistoryBufferTest(unittest.IsolatedAsyncioTestCase):
+    async def test_connection_failure_keeps_rows_for_next_flush(self):
+        engine = FakeEngine(OSError("connection reset"))
+        buffer = SearchHistoryBuffer(max_buffered=3)
+        for index in range(2):
+            buffer.put_nowait(1, f"q{index}", 0)
+
+        with mock.patch.object(search_history_service, "engine", engine):
+            with self.assertRaises(OSError):
+                await buffer.flush()
+            buffer.put_nowait(1, "q2", 0)
+            await buffer.flush()
+
+        self.assertEqual([_queries(batch) for batch in engine.copied], [["q0", "q1", "q2"]])
+
+    async def test_requeued_rows_are_bounded(self):
+        engine = FakeEngine(OSError("down"), OSError("down"))
+        buffer = SearchHistoryBuffer(max_buffered=3)
+
+        with mock.patch.object(search_history_service, "engine", engine):
+            for batch in (["a", "b"], ["c", "d"]):
+                for query in batch:
+                    buffer.put_nowait(1, query, 0)
+                with self.assertRaises(OSError):
+                    await buffer.flush()
+            await buffer.flush()
+
+        self.assertEqual([_queries(batch) for batch in engine.copied], [["b", "c", "d"]])
+
+    async def test_rejected_batch_is_dropped(self):
+        engine = FakeEngine(ForeignKeyViolationError("user deleted"))
+        buffer = SearchHistoryBuffer()
+        buffer.put_nowait(1, "bad", 0)
+
+        with mock.patch.object(search_history_service, "engine", engine):
+            await buffer.flush()
+            buffer.put_nowait(2, "good", 0)
+            await buffer.flush()
+
+        self.assertEqual([_queries(batch) for batch in engine.copied], [["good"]])
+
+    async def test_nul_is_stripped_from_queries(self):
+        engine = FakeEngine()
+        buffer = SearchHistoryBuffer()
+        buffer.put_nowait(1, "a\x00b", 0)
+
+        with mock.patch.object(search_history_service, "engine", engine):
+            await buffer.flush()
+
+        self.assertEqual(_queries(engine.copied[0]), ["ab"])
+
+    async def test_failed_shutdown_flush_still_cancels(self):
+        engine = FakeEngine(OSError("down"))
+        buffer = SearchHistoryBuffer(flush_interval=60)
+
+        with mock.patch.object(search_history_service, "engine", engine):
+            task = asyncio.create_task(buffer.run())
+            await asyncio.sleep(0)
+            buffer.put_nowait(1, "q", 0)
+            task.cancel()
+            with self.assertLogs(search_history_service.logger, "ERROR"):
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+
+if __name__ == "__main__":
+    unittest.main()